@@ -2,19 +2,26 @@ import csv
 import random
 import os
 from datetime import datetime
-import speech_recognition as sr
-import pyttsx3
 import pygame
 from pygame import mixer
 import json
 import time
 import re
+import contextlib
+import itertools
 from collections import defaultdict
+from Lexicon import match_text
+from Utterance_Cache import cache_stats
+from Speech_Backends import get_backend, default_source
+from TTS_Cache import CachedSpeech
+from Playback_Engine import get_engine
+from Streaming_TTS import StreamingSpeaker
 
 # Configuration
 CSV_FILE = 'Patient_Data.csv'
 MUSIC_FOLDER = 'Music'
 SESSION_LOG = 'session_log.json'
+SHOW_SPEECH_TIMINGS = True  # Time-to-first-audio and synthesis time per reply
 
 class MusicPlayer:
     def __init__(self):
@@ -67,45 +74,45 @@ class MusicPlayer:
 
 class VoiceInterface:
     def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
-        self.engine = pyttsx3.init()
-        
-        # Configure voice properties
-        voices = self.engine.getProperty('voices')
-        self.engine.setProperty('rate', 150)
-        self.engine.setProperty('volume', 1.0)
-        
-        # Try to find a female voice
-        for voice in voices:
-            if 'female' in voice.name.lower():
-                self.engine.setProperty('voice', voice.id)
-                break
+        # Recognizer backend and audio source come from ALZIE_ASR_BACKEND / ALZIE_AUDIO_SOURCE;
+        # the default source is a persistent microphone stream with VAD
+        self.recognizer = get_backend()
+        self.source = default_source()
+        # The shared synthesizer worker renders into the phrase cache in this voice
+        self.speech = CachedSpeech(rate=150, volume=1.0)
+        self.playback = get_engine()
+        # Long replies are spoken sentence by sentence while the rest is synthesized
+        self.speaker = StreamingSpeaker(self.speech, self.playback)
+    
+    def prerender(self, phrases):
+        """Render likely replies in the background so speaking them is instant"""
+        self.speech.prerender(self.speaker.phrases_to_prerender(phrases))
     
     def listen(self):
-        with self.microphone as source:
-            print("\nListening... (speak now)")
-            try:
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=8)
-                text = self.recognizer.recognize_google(audio).lower()
-                print(f"Recognized: {text}")
-                return text
-            except sr.WaitTimeoutError:
-                print("Listening timeout - no speech detected")
-                return None
-            except sr.UnknownValueError:
-                print("Could not understand speech")
-                return None
-            except Exception as e:
-                print(f"Voice recognition error: {e}")
+        print("\nListening... (speak now)")
+        try:
+            text = self.recognizer.transcribe(
+                self.source, timeout=5, phrase_time_limit=8,
+                on_partial=lambda partial: print(f"  ...{partial}", end='\r'))
+            if not text:
                 return None
+            text = text.lower()
+            print(f"Recognized: {text}")
+            return text
+        except Exception as e:
+            print(f"Voice recognition error: {e}")
+            return None
     
     def speak(self, text):
         print(f"AlziE: {text}")
+        # The microphone stays open between turns; don't let it segment our own voice
+        pause = getattr(self.source, 'pause', None)
         try:
-            self.engine.say(text)
-            self.engine.runAndWait()
+            with pause() if pause else contextlib.nullcontext():
+                utterance = self.speaker.speak(text)
+                utterance.wait()
+            if SHOW_SPEECH_TIMINGS:
+                print(f"  (speech: {utterance.timings()})")
         except Exception as e:
             print(f"Speech synthesis error: {e}")
 
@@ -119,21 +126,18 @@ class MoodAnalyzer:
         if not text:
             return self.current_mood
             
-        positive_words = ['happy','good','great','wonderful','joy','excited','fantastic','perfect','amazing','calm']
-        negative_words = ['sad','angry','upset','scared','afraid','depressed','anxious','worried','frustrated','lost','confused']
-        urgent_words = ['help','emergency','danger','pain','hurt','fall','bleeding']
-        
-        text_lower = text.lower()
+        # Mood keywords and their stress weights live in Lexicon.json
+        match = match_text(text)
         
-        if any(word in text_lower for word in urgent_words):
+        if match.has('mood_urgent'):
             self.current_mood = "urgent"
-            self.stress_level = min(10, self.stress_level + 3)
-        elif any(word in text_lower for word in positive_words):
+            self.stress_level = min(10, self.stress_level + match.max_weight('mood_urgent'))
+        elif match.has('mood_positive'):
             self.current_mood = "positive"
-            self.stress_level = max(0, self.stress_level - 1)
-        elif any(word in text_lower for word in negative_words):
+            self.stress_level = max(0, self.stress_level + match.max_weight('mood_positive'))
+        elif match.has('mood_negative'):
             self.current_mood = "negative"
-            self.stress_level = min(10, self.stress_level + 2)
+            self.stress_level = min(10, self.stress_level + match.max_weight('mood_negative'))
         else:
             self.current_mood = "neutral"
             
@@ -329,27 +333,26 @@ class ResponseEngine:
         patient = self.db.current_patient
         name = patient.get('first_name', 'friend')
         mood = self.mood_analyzer.analyze_text(input_text)
+        intents = match_text(input_text)
         
         # Handle common queries
-        if any(word in input_text for word in ['who am i', 'my name', 'what is my name']):
-            return (f"You are {patient['first_name']} {patient['last_name']}, "
-                   f"a {patient['age']} year old. You live at {patient.get('address', 'your home')}.")
+        if intents.has('intent_identity'):
+            return self._identity_reply(patient)
         
-        if any(word in input_text for word in ['where am i', 'what is this place', 'location']):
-            return f"You're at {patient.get('address', 'your home')} in {patient.get('city', 'your city')}."
+        if intents.has('intent_location'):
+            return self._location_reply(patient)
         
-        if any(word in input_text for word in ['who are you', 'what are you']):
+        if intents.has('intent_assistant'):
             return "I'm AlziE, your personal care assistant. I'm here to help and support you."
         
         # Emergency situations
-        if any(word in input_text for word in ['call', 'contact', 'emergency', 'help me']) or mood == "urgent":
-            contact = f"{patient['emergency_contact1']} ({patient['emergency_relation1']})"
-            return random.choice(self.templates['emergency']).format(contact=contact)
+        if intents.has('intent_emergency') or mood == "urgent":
+            return random.choice(self.templates['emergency']).format(contact=self._contact(patient))
         
         # Mood-based responses
         intervention = self.mood_analyzer.get_suggested_intervention(patient)
         if intervention == "emergency_contact":
-            contact = f"{patient['emergency_contact1']} ({patient['emergency_relation1']})"
+            contact = self._contact(patient)
             return f"You seem very stressed. {random.choice(self.templates['emergency']).format(contact=contact)}"
         elif intervention == "music":
             if self.music.play_music():
@@ -357,23 +360,21 @@ class ResponseEngine:
                     music_preference=patient.get('music_preference', 'music'))
             return "Let's take some deep breaths together."
         elif intervention == "family_reassurance":
-            family_member = random.choice([patient.get('father_name', 'father'), 
-                                         patient.get('mother_name', 'mother')])
-            return f"Would you like to talk about {family_member}?"
+            return f"Would you like to talk about {random.choice(self._family_members(patient))}?"
         
         # Music control
-        if any(word in input_text for word in ['play music', 'some music', 'listen to']):
+        if intents.has('intent_music_play'):
             if self.music.play_music():
                 return random.choice(self.templates['music']).format(
                     music_preference=patient.get('music_preference', 'music'))
             return "I couldn't find any music to play."
         
-        if any(word in input_text for word in ['stop music', 'quiet', 'turn off']):
+        if intents.has('intent_music_stop'):
             self.music.stop_music()
             return "The music has been stopped."
         
         # Greeting
-        if any(word in input_text for word in ['hello', 'hi', 'good morning', 'good afternoon']):
+        if intents.has('intent_greeting'):
             return random.choice(self.templates['greeting']).format(
                 time=self._get_time_of_day())
         
@@ -383,6 +384,55 @@ class ResponseEngine:
                                f"What would you like to do, {name}?"])
         return random.choice(self.templates['default'])
     
+    def _identity_reply(self, patient):
+        return (f"You are {patient['first_name']} {patient['last_name']}, "
+               f"a {patient['age']} year old. You live at {patient.get('address', 'your home')}.")
+    
+    def _location_reply(self, patient):
+        return f"You're at {patient.get('address', 'your home')} in {patient.get('city', 'your city')}."
+    
+    def _contact(self, patient):
+        return f"{patient['emergency_contact1']} ({patient['emergency_relation1']})"
+    
+    def _family_members(self, patient):
+        return [patient.get('father_name', 'father'), patient.get('mother_name', 'mother')]
+    
+    def likely_phrases(self, patient):
+        """Every reply the conversation can speak to this patient, filled with their details"""
+        name = patient.get('first_name', 'friend')
+        contact = self._contact(patient)
+        fields = {
+            'time': ['morning', 'afternoon', 'evening'],
+            'music_preference': [patient.get('music_preference', 'music')],
+            'contact': [contact],
+        }
+        phrases = [
+            "Welcome to AlziE. I'm ready to assist you.",
+            "Goodbye for now. Remember, I'm always here when you need me.",
+            "Goodbye. Have a peaceful day.",
+            "Let's try that again. Could you please repeat what you said?",
+            "I didn't hear that clearly",
+            "Could you please repeat that?",
+            self._identity_reply(patient),
+            self._location_reply(patient),
+            "I'm AlziE, your personal care assistant. I'm here to help and support you.",
+            "Let's take some deep breaths together.",
+            "I couldn't find any music to play.",
+            "The music has been stopped.",
+            f"{name}, I'm here with you",
+            f"What would you like to do, {name}?",
+        ]
+        phrases += [f"Would you like to talk about {member}?" for member in self._family_members(patient)]
+        # Only these template groups are ever spoken by generate_response
+        for group in ('greeting', 'music', 'emergency', 'default'):
+            for template in self.templates[group]:
+                names = re.findall(r'{(\w+)}', template)
+                choices = [fields.get(field, []) for field in names]
+                for values in itertools.product(*choices):  # Nothing if a field has no values
+                    phrases.append(template.format(**dict(zip(names, values))))
+        phrases += [f"You seem very stressed. {t.format(contact=contact)}" for t in self.templates['emergency']]
+        return phrases
+    
     def _get_time_of_day(self):
         hour = datetime.now().hour
         if hour < 12: return 'morning'
@@ -415,8 +465,11 @@ class SessionLogger:
             'response': system_response
         })
     
-    def save_session(self):
+    def save_session(self, tts_stats=None):
         self.session_data['end_time'] = datetime.now().isoformat()
+        self.session_data['cache_stats'] = cache_stats()
+        if tts_stats is not None:
+            self.session_data['tts_cache_stats'] = tts_stats
         try:
             with open(SESSION_LOG, 'a') as f:
                 json.dump(self.session_data, f)
@@ -437,6 +490,7 @@ def simulate_conversation():
         voice = VoiceInterface()
         music_player = MusicPlayer()
         engine = ResponseEngine(db, voice, music_player)
+        voice.prerender(engine.likely_phrases(db.current_patient))
         logger = SessionLogger()
         
         print("System ready. Starting conversation...")
@@ -450,7 +504,7 @@ def simulate_conversation():
                 if user_input is None:
                     continue
                 
-                if any(word in user_input for word in ['goodbye', 'quit', 'exit', 'bye']):
+                if match_text(user_input).has('intent_goodbye'):
                     voice.speak("Goodbye for now. Remember, I'm always here when you need me.")
                     break
                 
@@ -465,7 +519,9 @@ def simulate_conversation():
                 print(f"Conversation error: {e}")
                 voice.speak("Let's try that again. Could you please repeat what you said?")
         
-        logger.save_session()
+        logger.save_session(tts_stats=voice.speech.stats())
+        print(f"Utterance cache: {cache_stats()}")
+        print(f"Speech cache: {voice.speech.stats()}")
         print("\nConversation ended.")
         
     except Exception as e:
@@ -1,12 +1,11 @@
 import os
-import time
-import pygame
-from pygame import mixer
+import sys
+
+# Playback goes through the shared in-process engine in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Playback_Engine import get_engine, play_files
 
 def play_and_delete_audio_files():
-    # Initialize pygame mixer with optimal settings for voice audio
-    pygame.mixer.init(frequency=22050, size=-16, channels=1, buffer=2048)
-    
     # Get the directory where this script is located
     current_dir = os.path.dirname(os.path.abspath(__file__))
     
@@ -21,30 +20,10 @@ def play_and_delete_audio_files():
     
     print(f"Found {len(audio_files)} audio file(s) to play:")
     
-    for audio_file in audio_files:
-        file_path = os.path.join(current_dir, audio_file)
-        try:
-            print(f"Playing: {audio_file}")
-            
-            # Load and play the sound
-            sound = mixer.Sound(file_path)
-            channel = sound.play()
-            
-            # Wait for playback to finish
-            while channel.get_busy():
-                pygame.time.Clock().tick(10)  # More efficient than sleep
-                
-            # Delete the file after successful playback
-            os.remove(file_path)
-            print(f"Deleted: {audio_file}")
-            
-        except pygame.error as e:
-            print(f"Error playing {audio_file}: {str(e)}")
-        except Exception as e:
-            print(f"Error processing {audio_file}: {str(e)}")
-    
-    # Clean up mixer resources
-    pygame.mixer.quit()
+    # Files are queued back to back and deleted from the completion callback
+    last = play_files([os.path.join(current_dir, f) for f in audio_files],
+                      delete_after=True)
+    last.wait()
     print("Finished processing all audio files")
 
 if __name__ == "__main__":
@@ -53,6 +32,4 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print("\nPlayback interrupted by user")
     finally:
-        os.exit()
-
-
+        get_engine().close()
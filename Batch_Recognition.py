@@ -0,0 +1,227 @@
+import os
+import sys
+import cv2
+import json
+import time
+import argparse
+import face_recognition
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from Face_Gallery import FaceGallery, GALLERY_DIR
+from Facial_Recognition import FRAME_SCALE, MIN_CONFIDENCE
+
+# Settings
+FRAME_EVERY = 5  # Process one frame out of every N
+BATCH_SIZE = 16  # Frames matched against the gallery together
+SEGMENTS_PER_WORKER = 4  # Video files are split into this many segments per worker
+DIRECTORY_FPS = 1.0  # Timestamps for image directories: frame index / fps
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp')
+
+_gallery = None  # Loaded once per worker process
+
+
+def _init_worker(gallery_dir):
+    global _gallery
+    cv2.setNumThreads(1)
+    _gallery = FaceGallery.load_default(gallery_dir)
+
+
+def _small_rgb(frame, scale):
+    small = cv2.resize(frame, (0, 0), fx=scale, fy=scale)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+
+
+def recognize_frames(gallery, frames, scale=FRAME_SCALE):
+    """Detect, encode and match a batch of (frame_idx, timestamp, small_rgb) frames.
+
+    Faces from the whole batch are matched against the gallery in one call.
+    Returns one detection record per face, boxes in full-resolution pixels.
+    """
+    boxes, encodings = [], []
+    for frame_idx, timestamp, rgb in frames:
+        face_locations = face_recognition.face_locations(rgb, model="hog")
+        if not face_locations:
+            continue
+        for box, encoding in zip(face_locations, face_recognition.face_encodings(rgb, face_locations)):
+            boxes.append((frame_idx, timestamp, box))
+            encodings.append(encoding)
+
+    records = []
+    for (frame_idx, timestamp, box), face_matches in zip(boxes, gallery.match(encodings, k=1)):
+        label, distance = face_matches[0] if face_matches else ("Unknown", 1.0)
+        if (1 - distance) * 100 < MIN_CONFIDENCE:
+            label = "Unknown"
+        records.append({
+            'frame': frame_idx,
+            'timestamp': round(timestamp, 3),
+            'box': [int(x / scale) for x in box],
+            'label': label,
+            'distance': round(distance, 4),
+        })
+    return records
+
+
+def _process_video_segment(path, start, stop, every, scale, batch_size):
+    """Decode and recognize frames [start, stop) of a video file in one worker"""
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+    records, batch = [], []
+    for frame_idx in range(start, stop):
+        # grab() skips frames without the cost of converting them
+        if (frame_idx - start) % every:
+            if not cap.grab():
+                break
+            continue
+        ret, frame = cap.read()
+        if not ret:
+            break
+        batch.append((frame_idx, frame_idx / fps, _small_rgb(frame, scale)))
+        if len(batch) >= batch_size:
+            records.extend(recognize_frames(_gallery, batch, scale))
+            batch = []
+    if batch:
+        records.extend(recognize_frames(_gallery, batch, scale))
+    cap.release()
+    return records
+
+
+def _process_image_files(indexed_paths, scale, fps):
+    """Recognize a chunk of [(frame_idx, path)] image files in one worker"""
+    batch = []
+    for frame_idx, path in indexed_paths:
+        frame = cv2.imread(path)
+        if frame is None:
+            print(f"Could not read {path}")
+            continue
+        batch.append((frame_idx, frame_idx / fps, _small_rgb(frame, scale)))
+    records = recognize_frames(_gallery, batch, scale)
+    names = dict(indexed_paths)
+    for record in records:
+        record['file'] = os.path.basename(names[record['frame']])
+    return records
+
+
+def _recognize_stream_batch(batch, scale):
+    return recognize_frames(_gallery, batch, scale)
+
+
+def _ordered(executor, tasks, max_pending):
+    """Submit (fn, *args) tasks with bounded look-ahead and yield results in order"""
+    pending = deque()
+    for fn, *args in tasks:
+        pending.append(executor.submit(fn, *args))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _video_tasks(path, every, scale, batch_size, workers):
+    cap = cv2.VideoCapture(path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    if total <= 0:
+        # Container without a frame count: decode it like a stream
+        yield from _stream_tasks(path, every, scale, batch_size)
+        return
+    segments = max(1, workers * SEGMENTS_PER_WORKER)
+    # Segment boundaries are aligned to `every` so skipping stays uniform
+    step = max(every, -(-total // segments // every) * every)
+    for start in range(0, total, step):
+        yield _process_video_segment, path, start, min(start + step, total), every, scale, batch_size
+
+
+def _directory_tasks(directory, scale, batch_size, fps):
+    files = sorted(f for f in os.listdir(directory) if f.lower().endswith(IMAGE_EXTENSIONS))
+    indexed = [(i, os.path.join(directory, f)) for i, f in enumerate(files)]
+    for start in range(0, len(indexed), batch_size):
+        yield _process_image_files, indexed[start:start + batch_size], scale, fps
+
+
+def _stream_tasks(url, every, scale, batch_size):
+    """Decode a live or network stream in this process and hand out frame batches"""
+    cap = cv2.VideoCapture(url)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    frame_idx, batch = 0, []
+    while True:
+        if frame_idx % every:
+            if not cap.grab():
+                break
+        else:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            batch.append((frame_idx, frame_idx / fps, _small_rgb(frame, scale)))
+            if len(batch) >= batch_size:
+                yield _recognize_stream_batch, batch, scale
+                batch = []
+        frame_idx += 1
+    if batch:
+        yield _recognize_stream_batch, batch, scale
+    cap.release()
+
+
+def iter_detections(source, every=FRAME_EVERY, batch_size=BATCH_SIZE, workers=None,
+                    scale=FRAME_SCALE, gallery_dir=GALLERY_DIR, fps=DIRECTORY_FPS):
+    """Yield detection records for a video file, stream URL or image directory, in frame order"""
+    workers = workers or os.cpu_count() or 1
+    if os.path.isdir(source):
+        tasks = _directory_tasks(source, scale, batch_size, fps)
+    elif '://' in source or not os.path.exists(source):
+        tasks = _stream_tasks(source, every, scale, batch_size)
+    else:
+        tasks = _video_tasks(source, every, scale, batch_size, workers)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(gallery_dir,)) as executor:
+        for records in _ordered(executor, tasks, max_pending=workers * 2):
+            for record in records:
+                yield record
+
+
+def footage_seconds(source):
+    """Duration of a video file in seconds, or None for streams and directories"""
+    if os.path.isdir(source) or not os.path.exists(source):
+        return None
+    cap = cv2.VideoCapture(source)
+    frames, fps = cap.get(cv2.CAP_PROP_FRAME_COUNT), cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    return frames / fps if frames > 0 and fps > 0 else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless face recognition over recorded footage")
+    parser.add_argument('source', help="Video file, stream URL (rtsp://...) or directory of frames")
+    parser.add_argument('--output', '-o', default='-', help="JSONL output file (default: stdout)")
+    parser.add_argument('--every', type=int, default=FRAME_EVERY, help="Process one frame in every N")
+    parser.add_argument('--batch', type=int, default=BATCH_SIZE, help="Frames per batch")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--scale', type=float, default=FRAME_SCALE, help="Downscale factor before detection")
+    parser.add_argument('--fps', type=float, default=DIRECTORY_FPS, help="Frame rate assumed for image directories")
+    args = parser.parse_args()
+
+    out = open(args.output, 'w') if args.output != '-' else None
+    start = time.perf_counter()
+    count = 0
+    try:
+        for record in iter_detections(args.source, args.every, args.batch, args.workers,
+                                      args.scale, fps=args.fps):
+            line = json.dumps(record)
+            if out:
+                out.write(line + '\n')
+            else:
+                print(line)
+            count += 1
+    finally:
+        if out:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    duration = footage_seconds(args.source)
+    speed = f", {duration / elapsed:.1f}x real time" if duration and elapsed > 0 else ""
+    print(f"{count} detections in {elapsed:.1f}s{speed}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
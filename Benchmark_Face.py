@@ -0,0 +1,177 @@
+import os
+import cv2
+import json
+import time
+import platform
+import argparse
+import subprocess
+import numpy as np
+import face_recognition
+from Encode_Generator import process_image, FOLDER_PATH, IMAGE_EXTENSIONS
+from Face_Gallery import FaceGallery, ENCODING_SIZE
+from Face_Index import IVFIndex, N_PROBE
+
+# Settings
+RESULTS_DIR = 'Benchmarks'
+FRAME_SCALES = (0.25, 0.5, 1.0)
+MODELS = ('hog', 'cnn')
+GALLERY_SIZES = (10, 1000, 100000)
+FACES_PER_FRAME = (1, 4)
+MATCH_REPEATS = 200
+IMAGE_LIMIT = 40  # Images from Picture_Source used per benchmark
+
+
+def percentiles(samples):
+    """Latency summary in milliseconds"""
+    ms = np.array(samples) * 1000
+    return {'p50_ms': float(np.percentile(ms, 50)),
+            'p95_ms': float(np.percentile(ms, 95)),
+            'p99_ms': float(np.percentile(ms, 99)),
+            'mean_ms': float(ms.mean())}
+
+
+def fixture_images(limit=IMAGE_LIMIT):
+    """Image paths from the bundled Picture_Source folders, spread across persons"""
+    per_person = []
+    for person_id in sorted(os.listdir(FOLDER_PATH)):
+        person_path = os.path.join(FOLDER_PATH, person_id)
+        if os.path.isdir(person_path):
+            per_person.append([os.path.join(person_path, f) for f in sorted(os.listdir(person_path))
+                               if f.lower().endswith(IMAGE_EXTENSIONS)])
+    paths = []
+    while len(paths) < limit and any(per_person):
+        for images in per_person:
+            if images and len(paths) < limit:
+                paths.append(images.pop(0))
+    return paths
+
+
+def bench_encoding(paths):
+    """Full Encode_Generator.process_image cost, in images per second"""
+    start = time.perf_counter()
+    found = sum(1 for path in paths if process_image(path, None)[0] is not None)
+    elapsed = time.perf_counter() - start
+    return {'images': len(paths), 'faces_found': found, 'images_per_s': len(paths) / elapsed}
+
+
+def bench_detection(paths, scales=FRAME_SCALES, models=MODELS):
+    """face_locations latency per FRAME_SCALE and detector model"""
+    frames = [cv2.cvtColor(img, cv2.COLOR_BGR2RGB) for img in map(cv2.imread, paths) if img is not None]
+    results = {}
+    for model in models:
+        for scale in scales:
+            samples = []
+            try:
+                for rgb in frames:
+                    small = cv2.resize(rgb, (0, 0), fx=scale, fy=scale)
+                    start = time.perf_counter()
+                    face_recognition.face_locations(small, model=model)
+                    samples.append(time.perf_counter() - start)
+            except Exception as e:  # cnn needs dlib built with its CNN model
+                print(f"Skipping {model} detection: {e}")
+                break
+            results[f"{model}@{scale}"] = percentiles(samples)
+            print(f"detect {model} scale {scale}: p50 {results[f'{model}@{scale}']['p50_ms']:.1f}ms")
+    return results
+
+
+def synthetic_gallery(size, seed=0):
+    """Random encodings with roughly the spread of real face_recognition vectors"""
+    rng = np.random.default_rng(seed)
+    encodings = rng.normal(0, 0.09, size=(size, ENCODING_SIZE)).astype(np.float32)
+    return FaceGallery(encodings, np.array([f"p{i}" for i in range(size)]))
+
+
+def bench_matching(sizes=GALLERY_SIZES, faces_per_frame=FACES_PER_FRAME, repeats=MATCH_REPEATS):
+    """FaceGallery.match latency versus gallery size, exact and with the IVF index"""
+    rng = np.random.default_rng(1)
+    results = {}
+    for size in sizes:
+        gallery = synthetic_gallery(size)
+        index = IVFIndex.build(gallery.encodings) if size >= 1000 else None
+        for faces in faces_per_frame:
+            queries = [gallery.encodings[rng.integers(size, size=faces)]
+                       + rng.normal(0, 0.03, size=(faces, ENCODING_SIZE)).astype(np.float32)
+                       for _ in range(repeats)]
+
+            samples, exact = [], []
+            for q in queries:
+                start = time.perf_counter()
+                exact.append(gallery.match(q, k=1))
+                samples.append(time.perf_counter() - start)
+            results[f"exact/{size}/{faces}"] = percentiles(samples)
+
+            if index is not None:
+                gallery.index = index
+                samples, hits = [], 0
+                for q, truth in zip(queries, exact):
+                    start = time.perf_counter()
+                    approx = gallery.match(q, k=1, n_probe=N_PROBE)
+                    samples.append(time.perf_counter() - start)
+                    hits += sum(a[0][0] == t[0][0] for a, t in zip(approx, truth))
+                results[f"ivf/{size}/{faces}"] = dict(percentiles(samples),
+                                                      recall=hits / (faces * len(queries)))
+                gallery.index = None
+            print(f"match {size} identities x {faces} faces: "
+                  f"p50 {results[f'exact/{size}/{faces}']['p50_ms']:.3f}ms")
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def compare(current, baseline_path):
+    """Print latency changes against an earlier results file"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    for section in ('detection', 'matching'):
+        for key, stats in current.get(section, {}).items():
+            old = baseline.get(section, {}).get(key)
+            if old:
+                change = (stats['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100
+                flag = "  <-- slower" if change > 10 else ""
+                print(f"{section} {key}: p50 {old['p50_ms']:.3f} -> {stats['p50_ms']:.3f}ms ({change:+.0f}%){flag}")
+    old_rate = baseline.get('encoding', {}).get('images_per_s')
+    if old_rate and 'encoding' in current:
+        print(f"encoding: {old_rate:.2f} -> {current['encoding']['images_per_s']:.2f} images/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the face encoding, detection and matching pipeline")
+    parser.add_argument('--limit', type=int, default=IMAGE_LIMIT, help="Picture_Source images to use")
+    parser.add_argument('--skip-images', action='store_true', help="Only run the synthetic matching benchmark")
+    parser.add_argument('--models', nargs='+', default=list(MODELS), help="Detector models to time")
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+    }
+    if not args.skip_images:
+        paths = fixture_images(args.limit)
+        print(f"Using {len(paths)} images from {FOLDER_PATH}")
+        results['encoding'] = bench_encoding(paths)
+        print(f"encoding: {results['encoding']['images_per_s']:.2f} images/s")
+        results['detection'] = bench_detection(paths, models=args.models)
+    results['matching'] = bench_matching()
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = os.path.join(RESULTS_DIR, f"face_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
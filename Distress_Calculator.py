@@ -1,11 +1,18 @@
 import numpy as np
-from Sentiment_analysis import SentimentAnalyzer  # Fixed import
+from Sentiment_analysis import analyze_text
+from Lexicon import match_text
+from Distress_Model import load_model
+
+# Example vitals used when no monitor feed is available for the patient
+DEFAULT_HEART_RATE = 85
+DEFAULT_BLOOD_PRESSURE = 120
+
 
 def calculate_word_choice_score(text):
     """Calculate distress score based on word choices"""
-    distress_words = ['pain', 'help', 'scared', 'afraid']  # Add your keywords
-    words = text.lower().split()
-    return sum(1 for word in words if word in distress_words) / len(words) if words else 0
+    # Keywords live in the 'distress' category of Lexicon.json
+    match = match_text(text)
+    return len(match.hits('distress')) / match.token_count if match.token_count else 0
 
 def calculate_context_score(text):
     """Calculate context score based on punctuation and length"""
@@ -15,20 +22,31 @@ def calculate_context_score(text):
     if len(text.split()) > 10: score += 0.1
     return min(score, 1.0)
 
-def Calc_Panic_Prob(model, text=""):
-    """Calculate panic probability"""
+def Calc_Panic_Prob(model=None, text="", vitals=None, patient_id=None):
+    """Calculate panic probability
+
+    model defaults to the exported NumPy model, so TensorFlow is not needed here.
+    With a Vitals_Stream.VitalsMonitor, the patient's rolling heart rate and
+    blood pressure means replace the fixed example vitals. The text adds its
+    polarity, word choice and context scores, in Training_Data's column order.
+    """
     if not text:
         return 0.0
+    if model is None:
+        model = load_model()
     
-    analyzer = SentimentAnalyzer(text)
-    result, polarity = analyzer.analyze_sentiment()
+    # Cached, so repeated utterances skip the sentiment pipeline
+    polarity = analyze_text(text)['polarity']
+    text_scores = (polarity, calculate_word_choice_score(text), calculate_context_score(text))
     
-    # Get vital signs - you'll need to implement this
-    heart_rate = 85  # Example - replace with actual measurement
-    blood_pressure = 120  # Example
+    if vitals is not None and vitals.has_readings(patient_id):
+        # The monitor's feature row already is the model input; predict reads a view
+        vitals.set_text_scores(patient_id, *text_scores)
+        sample = vitals.model_input(patient_id)
+    else:
+        sample = np.array([[DEFAULT_HEART_RATE, DEFAULT_BLOOD_PRESSURE, *text_scores]])
     
     # Make prediction
-    sample = np.array([[heart_rate, blood_pressure, polarity]])
     prediction = model.predict(sample)
     
-    return float(prediction[0][0])
\ No newline at end of file
+    return float(prediction[0][0])
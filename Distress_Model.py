@@ -0,0 +1,117 @@
+import os
+import time
+import threading
+import numpy as np
+
+# Configuration
+MODEL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Models', 'distress_model.npz')
+ARTIFACT_VERSION = 1  # Bump when the .npz layout changes; older artifacts are retrained
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0, out=x),
+    'sigmoid': lambda x: 1.0 / (1.0 + np.exp(-x)),
+    'tanh': np.tanh,
+}
+
+
+def export_keras_weights(model, path=MODEL_FILE, mean=None, std=None, data_hash=''):
+    """Save the Dense layers of a trained Keras model as a small .npz
+
+    mean/std are the input normalization stats the model was trained with and
+    data_hash identifies the training data, so callers can tell when to retrain.
+    """
+    arrays = {
+        'version': np.array(ARTIFACT_VERSION),
+        'data_hash': np.array(data_hash),
+        'trained_at': np.array(time.time()),
+    }
+    if mean is not None:
+        arrays['mean'] = np.asarray(mean, dtype=np.float32)
+        arrays['std'] = np.asarray(std, dtype=np.float32)
+    layers = [layer for layer in model.layers if layer.get_weights()]
+    for i, layer in enumerate(layers):
+        kernel, bias = layer.get_weights()
+        arrays[f'W{i}'] = kernel.astype(np.float32)
+        arrays[f'b{i}'] = bias.astype(np.float32)
+        arrays[f'act{i}'] = np.array(layer.activation.__name__)
+    arrays['n_layers'] = np.array(len(layers))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+    print(f"Exported distress model weights to {path}")
+
+
+class NumpyDistressModel:
+    """Forward pass of the dense distress network in plain NumPy.
+
+    Drop-in for the Keras model at runtime: predict() takes an (n, features) batch
+    and returns (n, 1), without TensorFlow or its per-call dispatch overhead.
+    """
+
+    def __init__(self, weights, biases, activations, mean=None, std=None, data_hash=''):
+        self.weights = weights
+        self.biases = biases
+        self.activations = [ACTIVATIONS[name] for name in activations]
+        self.mean = mean
+        self.std = std
+        self.data_hash = data_hash
+
+    @classmethod
+    def load(cls, path=MODEL_FILE):
+        with np.load(path) as data:
+            n_layers = int(data['n_layers'])
+            return cls([data[f'W{i}'] for i in range(n_layers)],
+                       [data[f'b{i}'] for i in range(n_layers)],
+                       [str(data[f'act{i}']) for i in range(n_layers)],
+                       data['mean'] if 'mean' in data else None,
+                       data['std'] if 'std' in data else None,
+                       str(data['data_hash']) if 'data_hash' in data else '')
+
+    def predict(self, X):
+        out = np.asarray(X, dtype=np.float32)
+        if out.ndim == 1:
+            out = out[None, :]
+        if self.mean is not None:
+            out = (out - self.mean) / self.std
+        for weight, bias, activation in zip(self.weights, self.biases, self.activations):
+            out = activation(out @ weight + bias)
+        return out
+
+
+def read_metadata(path=MODEL_FILE):
+    """Version, data hash and training time of an artifact, or None if unusable"""
+    try:
+        with np.load(path) as data:
+            if 'version' not in data or int(data['version']) != ARTIFACT_VERSION:
+                return None
+            return {
+                'version': int(data['version']),
+                'data_hash': str(data['data_hash']),
+                'trained_at': float(data['trained_at']),
+            }
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def load_model(path=MODEL_FILE):
+    """The exported distress model, loaded once per process"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = NumpyDistressModel.load(path)
+    return _model
+
+
+def reset_model():
+    """Forget the loaded model so the next load_model() reads a new artifact"""
+    global _model
+    with _model_lock:
+        _model = None
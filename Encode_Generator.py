@@ -2,88 +2,232 @@ import cv2
 import face_recognition
 import pickle
 import os
+import hashlib
+import time
+import argparse
 import numpy as np
-from concurrent.futures import ThreadPoolExecutor
+from Face_Gallery import FaceGallery, MAX_PROTOTYPES
+from Face_Index import IVFIndex, INDEX_MIN_SIZE
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+# Configuration
+FOLDER_PATH = 'Picture_Source'
+OUTPUT_FILE = 'EncodeFile.p'
+CACHE_FILE = 'EncodeCache.p'  # Per-image encodings reused between runs
+CACHE_VERSION = 1
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+USE_PROCESSES = True  # Process pool per image; False falls back to threads
+MAX_WORKERS = None  # None = one worker per CPU core
+
+
+def process_image(img_path, person_id):
+    """Process a single image and return its face encoding"""
+    try:
+        img = cv2.imread(img_path)
+        if img is None:
+            return None, None
+
+        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        face_locations = face_recognition.face_locations(img_rgb, model='hog')
+
+        if not face_locations:
+            return None, None
+
+        face_encodings = face_recognition.face_encodings(img_rgb, face_locations)
+        if not face_encodings:
+            return None, None
+
+        return face_encodings[0], person_id  # Take first face found
+    except Exception as e:
+        print(f"Error processing {img_path}: {str(e)}")
+        return None, None
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the SHA-1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_cache(cache_file=CACHE_FILE):
+    """Load the per-image encoding cache, or an empty one if missing/outdated"""
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                cache = pickle.load(f)
+            if cache.get('version') == CACHE_VERSION:
+                return cache
+            print("Encoding cache is from an older version, rebuilding")
+        except Exception as e:
+            print(f"Could not read encoding cache: {e}")
+    return {'version': CACHE_VERSION, 'entries': {}}
+
+
+def save_cache(cache, cache_file=CACHE_FILE):
+    """Write the cache atomically so an interrupted run never corrupts it"""
+    tmp_file = cache_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(cache, f)
+    os.replace(tmp_file, cache_file)
+
+
+def lookup_cached(img_path, entries, by_hash):
+    """Return a reusable cache entry for img_path, or (None, sha1) if it must be encoded.
+
+    Unchanged files are matched on size + mtime without reading them; anything
+    else is hashed so renamed or copied photos still hit the cache.
+    """
+    stat = os.stat(img_path)
+    entry = entries.get(img_path)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry, entry['sha1']
+
+    sha1 = file_digest(img_path)
+    source = by_hash.get(sha1)
+    if source is not None:
+        return dict(source, size=stat.st_size, mtime_ns=stat.st_mtime_ns), sha1
+    return None, sha1
+
+
+def _init_worker():
+    """Keep each worker process on a single OpenCV thread to avoid oversubscription"""
+    cv2.setNumThreads(1)
+
+
+def encode_images(jobs, use_processes=USE_PROCESSES, max_workers=MAX_WORKERS):
+    """Encode (img_path, person_id) jobs, yielding (img_path, person_id, encoding) as each finishes.
+
+    Images are scheduled individually, so one person with many photos no longer
+    holds up the others. Process mode sidesteps the GIL for dlib/OpenCV work.
+    """
+    if not jobs:
+        return
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker)
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers or 4)
+
+    with executor:
+        futures = {executor.submit(process_image, img_path, person_id): (img_path, person_id)
+                   for img_path, person_id in jobs}
+        for future in as_completed(futures):
+            img_path, person_id = futures[future]
+            try:
+                encoding, _ = future.result()
+            except Exception as e:
+                print(f"Error processing {img_path}: {str(e)}")
+                encoding = None
+            yield img_path, person_id, encoding
+
+
+def main(use_processes=USE_PROCESSES, max_workers=MAX_WORKERS, max_prototypes=MAX_PROTOTYPES):
+    folderPath = FOLDER_PATH
+    output_file = OUTPUT_FILE
 
-def main():
-    # Configuration
-    folderPath = 'Picture_Source'
-    output_file = 'EncodeFile.p'
-    
     # Verify folder exists
     if not os.path.exists(folderPath):
         print(f"Error: Folder '{folderPath}' not found!")
         print("Please create the folder and add person subfolders with images.")
         return
-    
+
     pathList = os.listdir(folderPath)
     if not pathList:
         print(f"No person folders found in '{folderPath}'")
         return
-    
+
     print(f"Found {len(pathList)} persons in '{folderPath}'")
 
-    def process_image(img_path, person_id):
-        """Process a single image and return its face encoding"""
-        try:
-            img = cv2.imread(img_path)
-            if img is None:
-                return None, None
-            
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            face_locations = face_recognition.face_locations(img_rgb, model='hog')
-            
-            if not face_locations:
-                return None, None
-            
-            face_encodings = face_recognition.face_encodings(img_rgb, face_locations)
-            if not face_encodings:
-                return None, None
-            
-            return face_encodings[0], person_id  # Take first face found
-        except Exception as e:
-            print(f"Error processing {img_path}: {str(e)}")
-            return None, None
+    cache = load_cache()
+    entries = cache['entries']
+    by_hash = {entry['sha1']: entry for entry in entries.values()}
 
-    def process_person(person_id):
-        """Process all images for one person"""
+    # Resolve every image against the cache; only misses need encoding
+    new_entries = {}
+    person_images = {}
+    pending = []
+    for person_id in pathList:
         person_path = os.path.join(folderPath, person_id)
         if not os.path.isdir(person_path):
-            return []
-        
-        encodings = []
-        valid_images = 0
-        
+            continue
         for img_file in os.listdir(person_path):
-            if img_file.lower().endswith(('.png', '.jpg', '.jpeg')):
+            if img_file.lower().endswith(IMAGE_EXTENSIONS):
                 img_path = os.path.join(person_path, img_file)
-                encoding, _ = process_image(img_path, person_id)
-                if encoding is not None:
-                    encodings.append(encoding)
-                    valid_images += 1
-        
-        print(f"Processed {valid_images} valid images for {person_id}")
-        return encodings
+                person_images.setdefault(person_id, []).append(img_path)
+                entry, sha1 = lookup_cached(img_path, entries, by_hash)
+                if entry is None:
+                    stat = os.stat(img_path)
+                    new_entries[img_path] = {
+                        'size': stat.st_size,
+                        'mtime_ns': stat.st_mtime_ns,
+                        'sha1': sha1,
+                        'encoding': None,
+                    }
+                    pending.append((img_path, person_id))
+                else:
+                    new_entries[img_path] = entry
+
+    mode = "processes" if use_processes else "threads"
+    print(f"Encoding Started ({len(pending)} images, using {mode})...")
+
+    start_time = time.perf_counter()
+    for done, (img_path, person_id, encoding) in enumerate(
+            encode_images(pending, use_processes, max_workers), 1):
+        # Images without a face are cached too so they are not retried
+        new_entries[img_path]['encoding'] = encoding
+        if done % 50 == 0 or done == len(pending):
+            elapsed = time.perf_counter() - start_time
+            print(f"Encoded {done}/{len(pending)} images ({done / elapsed:.1f} images/s)")
 
-    print("Encoding Started (Using Parallel Processing)...")
+    if pending:
+        elapsed = time.perf_counter() - start_time
+        print(f"Encoding throughput: {len(pending) / elapsed:.1f} images/s over {elapsed:.1f}s")
 
-    # Process persons in parallel
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        all_encodings = list(executor.map(process_person, pathList))
+    # Rebuild the cache from this scan only, so removed images drop out
+    removed = len(set(entries) - set(new_entries))
+    cache['entries'] = new_entries
+    save_cache(cache)
+    print(f"Cache: {len(new_entries) - len(pending)} reused, {len(pending)} encoded, {removed} removed")
 
     # Group encodings by person ID
+    encodings_by_person = {}
     encodings_dict = {}
-    for person_id, encodings in zip(pathList, all_encodings):
+    for person_id, img_paths in person_images.items():
+        encodings = [new_entries[p]['encoding'] for p in img_paths
+                     if new_entries[p]['encoding'] is not None]
+        print(f"Processed {len(encodings)} valid images for {person_id}")
         if encodings:
-            encodings_dict[person_id] = np.mean(encodings, axis=0)  # Average encodings
+            encodings_by_person[person_id] = encodings
+            encodings_dict[person_id] = np.mean(encodings, axis=0)  # Average for EncodeFile.p
 
     # Save the results
     with open(output_file, 'wb') as file:
         pickle.dump(encodings_dict, file)
 
+    # Save the memory-mappable multi-prototype gallery used by Facial_Recognition
+    gallery = FaceGallery.from_person_encodings(encodings_by_person, max_prototypes)
+
+    # Approximate index for facility-scale galleries, saved in the same version
+    index = IVFIndex.build(gallery.encodings) if len(gallery) >= INDEX_MIN_SIZE else None
+    gallery.save(index=index)
+    print(f"Saved gallery with {len(gallery)} prototypes for {len(gallery.identities)} persons")
+    if index is not None:
+        print(f"Saved ANN index with {len(index.centroids)} lists")
+
     print(f"\nEncoding Completed! Processed {len(encodings_dict)} persons:")
     for person_id in encodings_dict:
         print(f"- {person_id}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Encode faces under Picture_Source")
+    parser.add_argument('--threads', action='store_true',
+                        help="Use a thread pool instead of a process pool")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help="Number of workers (default: all cores)")
+    parser.add_argument('--max-prototypes', type=int, default=MAX_PROTOTYPES,
+                        help="Prototypes kept per person (0 = keep every encoding)")
+    args = parser.parse_args()
+    main(use_processes=not args.threads, max_workers=args.workers,
+         max_prototypes=args.max_prototypes or None)
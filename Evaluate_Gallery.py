@@ -0,0 +1,98 @@
+import argparse
+import time
+import numpy as np
+from Encode_Generator import load_cache
+from Face_Gallery import FaceGallery
+from Facial_Recognition import MIN_CONFIDENCE  # Evaluate at the live recognizer's threshold
+
+# Gallery layouts to compare: label -> max prototypes per person
+MODES = {
+    'mean': 1,
+    'kmeans-3': 3,
+    'kmeans-5': 5,
+    'all': None,
+}
+
+
+def load_person_encodings():
+    """Group the cached per-image encodings (written by Encode_Generator) by person"""
+    encodings_by_person = {}
+    for img_path, entry in sorted(load_cache()['entries'].items()):
+        if entry['encoding'] is None:
+            continue
+        person_id = img_path.replace('\\', '/').split('/')[-2]
+        encodings_by_person.setdefault(person_id, []).append(np.asarray(entry['encoding'], dtype=np.float32))
+    return encodings_by_person
+
+
+def evaluate(encodings_by_person, max_prototypes, min_confidence=MIN_CONFIDENCE):
+    """Leave-one-out accuracy and match latency for one gallery layout
+
+    People with a single photo cannot be recognized once it is held out, so
+    they are scored separately as unknown faces: only a rejection is correct.
+    """
+    correct = accepted = false_accepts = total = 0
+    unknown = unknown_false_accepts = 0
+    latencies = []
+
+    for person_id, encodings in encodings_by_person.items():
+        for i in range(len(encodings)):
+            held_out = encodings[i]
+            train = dict(encodings_by_person)
+            train[person_id] = encodings[:i] + encodings[i + 1:]
+            if not train[person_id]:
+                del train[person_id]  # Only photo of this person, so it tests rejection
+            gallery = FaceGallery.from_person_encodings(train, max_prototypes)
+
+            start = time.perf_counter()
+            matches = gallery.match([held_out], k=1)[0]
+            latencies.append(time.perf_counter() - start)
+            label, distance = matches[0] if matches else (None, 1.0)  # Empty gallery rejects
+            is_accepted = label is not None and (1 - distance) * 100 >= min_confidence
+
+            if person_id not in train:
+                unknown += 1
+                unknown_false_accepts += is_accepted
+                continue
+            total += 1
+            correct += label == person_id
+            if is_accepted:
+                accepted += 1
+                false_accepts += label != person_id
+
+    latencies = np.array(latencies) * 1e6
+    return {
+        'images': total,
+        'top1_accuracy': correct / total if total else 0.0,
+        'accept_rate': accepted / total if total else 0.0,
+        'false_accept_rate': false_accepts / total if total else 0.0,
+        'unknown_images': unknown,
+        'unknown_false_accept_rate': unknown_false_accepts / unknown if unknown else 0.0,
+        'match_us_mean': float(latencies.mean()) if len(latencies) else 0.0,
+        'match_us_p95': float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+    }
+
+
+def main(min_confidence=MIN_CONFIDENCE):
+    encodings_by_person = load_person_encodings()
+    if not encodings_by_person:
+        print("No cached encodings found. Run Encode_Generator.py first.")
+        return
+
+    print(f"Evaluating {sum(len(e) for e in encodings_by_person.values())} images "
+          f"of {len(encodings_by_person)} persons (leave-one-out, threshold {min_confidence}%)")
+    singles = sum(len(e) == 1 for e in encodings_by_person.values())
+    if singles:
+        print(f"{singles} persons have a single photo; they are scored as unknown faces ('unk false')")
+    print(f"{'mode':<10} {'top-1':>7} {'accept':>7} {'false':>7} {'unk false':>9} {'mean us':>9} {'p95 us':>9}")
+    for mode, max_prototypes in MODES.items():
+        r = evaluate(encodings_by_person, max_prototypes, min_confidence)
+        print(f"{mode:<10} {r['top1_accuracy']:>7.1%} {r['accept_rate']:>7.1%} "
+              f"{r['false_accept_rate']:>7.1%} {r['unknown_false_accept_rate']:>9.1%} "
+              f"{r['match_us_mean']:>9.1f} {r['match_us_p95']:>9.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare gallery layouts on Picture_Source")
+    parser.add_argument('--min-confidence', type=float, default=MIN_CONFIDENCE)
+    args = parser.parse_args()
+    main(args.min_confidence)
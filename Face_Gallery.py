@@ -0,0 +1,296 @@
+import os
+import json
+import time
+import pickle
+import numpy as np
+
+# Configuration
+GALLERY_DIR = 'Gallery'
+MANIFEST_FILE = 'manifest.json'  # Points at the current version's .npy files
+ENCODING_SIZE = 128
+MAX_PROTOTYPES = 5  # Per-person cap; None keeps every encoding
+
+
+def kmeans(vectors, k, iterations=20, seed=0):
+    """Plain NumPy k-means with k-means++ seeding, returns (k, D) float32 centroids"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    k = min(k, len(vectors))
+    rng = np.random.default_rng(seed)
+
+    centroids = [vectors[rng.integers(len(vectors))]]
+    closest = np.sum((vectors - centroids[0]) ** 2, axis=1)
+    for _ in range(1, k):
+        total = closest.sum()
+        if total <= 0:
+            break
+        centroids.append(vectors[rng.choice(len(vectors), p=closest / total)])
+        closest = np.minimum(closest, np.sum((vectors - centroids[-1]) ** 2, axis=1))
+    centroids = np.array(centroids, dtype=np.float32)
+
+    for _ in range(iterations):
+        sq_dist = (np.sum(vectors ** 2, axis=1)[:, None]
+                   + np.sum(centroids ** 2, axis=1)[None, :]
+                   - 2.0 * vectors @ centroids.T)
+        assignment = np.argmin(sq_dist, axis=1)
+        updated = centroids.copy()
+        for c in range(len(centroids)):
+            members = vectors[assignment == c]
+            if len(members):  # Empty clusters keep their previous centroid
+                updated[c] = members.mean(axis=0)
+        if np.allclose(updated, centroids):
+            break
+        centroids = updated
+    return centroids
+
+
+def build_prototypes(encodings, max_prototypes=MAX_PROTOTYPES):
+    """Reduce one person's encodings to at most max_prototypes vectors.
+
+    None keeps every encoding, 1 is the old per-person mean, anything else
+    clusters the photos so different ages, lighting or glasses stay apart.
+    """
+    encodings = np.asarray(encodings, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+    if max_prototypes is None or len(encodings) <= max_prototypes:
+        return encodings
+    if max_prototypes == 1:
+        return encodings.mean(axis=0, keepdims=True)
+    return kmeans(encodings, max_prototypes)
+
+
+class FaceGallery:
+    """Known faces as one contiguous float32 (N, 128) matrix plus a label array.
+
+    A person may own several rows (prototypes). Rows of the same person are
+    kept contiguous, so the nearest prototype per person is a single
+    np.minimum.reduceat over the distance matrix. Matching computes the
+    distances from every face in a frame to the whole gallery with one matrix
+    product, so the per-frame cost stays flat as residents are added.
+    """
+
+    def __init__(self, encodings, labels):
+        encodings = np.asarray(encodings, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+        labels = np.asarray(labels)
+        if len(labels) != len(encodings):
+            raise ValueError("Gallery needs exactly one label per encoding")
+
+        starts = self._group_starts(labels)
+        if len(np.unique(labels)) != len(starts):
+            # Regroup so each person's prototypes are contiguous
+            order = np.argsort(labels, kind='stable')
+            encodings, labels = encodings[order], labels[order]
+            starts = self._group_starts(labels)
+
+        self.encodings = np.ascontiguousarray(encodings)
+        self.labels = labels
+        self.identity_starts = starts
+        self.identities = labels[starts] if len(labels) else labels
+        # Identity number of every row, used to group ANN candidates
+        self.row_identity = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(labels)]))
+        # Squared norms are reused by every distance computation
+        self._sq_norms = np.einsum('ij,ij->i', self.encodings, self.encodings)
+        # Optional ANN index, loaded from `directory` on first use
+        self.directory = None
+        self.version = None
+        self.files = {}
+        self._index = None
+        self._index_loaded = False
+
+    @staticmethod
+    def _group_starts(labels):
+        """Row index where each run of identical labels begins"""
+        if len(labels) == 0:
+            return np.zeros(0, dtype=np.intp)
+        return np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+
+    def __len__(self):
+        return len(self.labels)
+
+    @classmethod
+    def from_dict(cls, encodings_dict):
+        """Build a gallery from a {person_id: encoding} dict like EncodeFile.p"""
+        labels = list(encodings_dict.keys())
+        encodings = [encodings_dict[label] for label in labels]
+        return cls(np.array(encodings, dtype=np.float32).reshape(-1, ENCODING_SIZE),
+                   np.array(labels, dtype=str))
+
+    @classmethod
+    def from_person_encodings(cls, encodings_by_person, max_prototypes=MAX_PROTOTYPES):
+        """Build a multi-prototype gallery from {person_id: [encoding, ...]}"""
+        blocks, labels = [], []
+        for person_id, encodings in encodings_by_person.items():
+            prototypes = build_prototypes(encodings, max_prototypes)
+            blocks.append(prototypes)
+            labels.extend([person_id] * len(prototypes))
+        if not blocks:
+            return cls(np.zeros((0, ENCODING_SIZE), dtype=np.float32), np.array([], dtype=str))
+        return cls(np.vstack(blocks), np.array(labels, dtype=str))
+
+    @classmethod
+    def from_pickle(cls, path='EncodeFile.p'):
+        """Load a legacy EncodeFile.p pickle"""
+        with open(path, 'rb') as f:
+            return cls.from_dict(pickle.load(f))
+
+    @staticmethod
+    def read_manifest(directory=GALLERY_DIR):
+        """Return the saved gallery manifest, or None if there is none"""
+        try:
+            with open(os.path.join(directory, MANIFEST_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def load(cls, directory=GALLERY_DIR, mmap=True):
+        """Load the current saved gallery, memory-mapping the encodings by default.
+
+        Memory-mapped galleries are shared through the page cache, so any
+        number of processes can load the same version for the cost of one.
+        """
+        manifest = cls.read_manifest(directory)
+        if manifest is None:
+            raise FileNotFoundError(f"No gallery manifest in '{directory}'")
+        files = manifest['files']
+        mmap_mode = 'r' if mmap else None
+        encodings = np.load(os.path.join(directory, files['encodings']), mmap_mode=mmap_mode)
+        labels = np.load(os.path.join(directory, files['labels']), allow_pickle=False)
+        gallery = cls(encodings, labels)
+        gallery.directory = directory
+        gallery.version = manifest['version']
+        gallery.files = files
+        return gallery
+
+    @classmethod
+    def load_default(cls, directory=GALLERY_DIR, pickle_path='EncodeFile.p'):
+        """Load the NumPy gallery if present, falling back to EncodeFile.p"""
+        if cls.read_manifest(directory) is not None:
+            return cls.load(directory)
+        return cls.from_pickle(pickle_path)
+
+    def save(self, directory=GALLERY_DIR, index=None):
+        """Save as memory-mappable .npy files, switching readers over atomically.
+
+        Every save writes a new set of version-suffixed files and then replaces
+        manifest.json in one step, so a reader sees either the old or the new
+        gallery, never a mix. The previous version is kept for readers that are
+        still loading it; older ones are removed once no process has them mapped.
+        """
+        os.makedirs(directory, exist_ok=True)
+        previous = self.read_manifest(directory)
+        version = str(time.time_ns())
+
+        arrays = {'encodings': self.encodings, 'labels': self.labels.astype(str)}
+        if index is not None:
+            arrays.update(index.arrays())
+
+        files = {}
+        for name, array in arrays.items():
+            files[name] = f"{name}-{version}.npy"
+            np.save(os.path.join(directory, files[name]), np.asarray(array))
+
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump({'version': version, 'rows': len(self), 'files': files}, f)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+        keep = set(files.values()) | set((previous or {}).get('files', {}).values())
+        for name in os.listdir(directory):
+            if name.endswith('.npy') and name not in keep:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass  # Still memory-mapped elsewhere (Windows); the next save retries
+        self.directory, self.version, self.files = directory, version, files
+
+    @property
+    def index(self):
+        """The saved IVF index for this gallery, or None"""
+        if not self._index_loaded:
+            self._index_loaded = True
+            if self.directory is not None:
+                from Face_Index import IVFIndex
+                index = IVFIndex.load(self.directory, self.files)
+                if index is not None and len(index) == len(self):
+                    self._index = index
+                elif index is not None:
+                    print("Ignoring ANN index that does not match the gallery")
+        return self._index
+
+    @index.setter
+    def index(self, index):
+        self._index = index
+        self._index_loaded = True
+
+    def distances(self, face_encodings):
+        """Euclidean distances between M query encodings and the gallery, shape (M, N)"""
+        queries = np.asarray(face_encodings, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+        sq_dist = (np.einsum('ij,ij->i', queries, queries)[:, None]
+                   + self._sq_norms[None, :]
+                   - 2.0 * queries @ self.encodings.T)
+        np.maximum(sq_dist, 0, out=sq_dist)
+        return np.sqrt(sq_dist)
+
+    def identity_distances(self, face_encodings):
+        """Distance from each face to each person's nearest prototype, shape (M, P)"""
+        dist = self.distances(face_encodings)
+        if len(self.identities) == len(self.labels):
+            return dist  # One prototype per person
+        return np.minimum.reduceat(dist, self.identity_starts, axis=1)
+
+    def match(self, face_encodings, k=1, n_probe=None):
+        """Return the k nearest people for each face as [(label, distance), ...]
+
+        Large galleries with a saved index are searched approximately; pass
+        n_probe to force the index and trade recall for latency.
+        """
+        if len(face_encodings) == 0 or len(self) == 0:
+            return [[] for _ in range(len(face_encodings))]
+
+        from Face_Index import INDEX_MIN_SIZE, N_PROBE
+        if n_probe is not None or len(self) >= INDEX_MIN_SIZE:
+            if self.index is not None:
+                return self._match_index(face_encodings, k, n_probe or N_PROBE)
+
+        dist = self.identity_distances(face_encodings)
+        k = min(k, dist.shape[1])
+        if k < dist.shape[1]:
+            top = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(dist.shape[1]), dist.shape)
+        top_dist = np.take_along_axis(dist, top, axis=1)
+        order = np.argsort(top_dist, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_dist = np.take_along_axis(top_dist, order, axis=1)
+
+        return [[(str(self.identities[idx]), float(d)) for idx, d in zip(row_idx, row_dist)]
+                for row_idx, row_dist in zip(top, top_dist)]
+
+    def _match_index(self, face_encodings, k, n_probe):
+        """ANN candidates from the IVF index, re-ranked with exact distances"""
+        queries = np.asarray(face_encodings, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+        query_ids, rows = self.index.candidates(queries, n_probe)
+        results = [[] for _ in range(len(queries))]
+        if len(rows) == 0:
+            return results
+
+        # Sorted rows within each query keep reads from the memory map sequential
+        by_row = np.lexsort((rows, query_ids))
+        query_ids, rows = query_ids[by_row], rows[by_row]
+        sq_dist = (self._sq_norms[rows] + np.einsum('ij,ij->i', queries, queries)[query_ids]
+                   - 2.0 * np.einsum('ij,ij->i', self.encodings[rows], queries[query_ids]))
+        dist = np.sqrt(np.maximum(sq_dist, 0))
+
+        # Nearest candidate per (query, person) ...
+        ids = self.row_identity[rows]
+        order = np.lexsort((dist, ids, query_ids))
+        first = np.r_[True, (query_ids[order][1:] != query_ids[order][:-1])
+                      | (ids[order][1:] != ids[order][:-1])]
+        best = order[first]
+        # ... then the k nearest people per query
+        best = best[np.lexsort((dist[best], query_ids[best]))]
+        best_queries = query_ids[best]
+        group_start = np.flatnonzero(np.r_[True, best_queries[1:] != best_queries[:-1]])
+        rank = np.arange(len(best)) - np.repeat(group_start, np.diff(np.r_[group_start, len(best)]))
+        for b in best[rank < k]:
+            results[query_ids[b]].append((str(self.identities[ids[b]]), float(dist[b])))
+        return results
@@ -0,0 +1,85 @@
+import os
+import numpy as np
+from Face_Gallery import kmeans
+
+# Configuration
+N_PROBE = 8  # Lists searched per query: higher = better recall, slower
+INDEX_MIN_SIZE = 50000  # Below this many rows exact matching is faster (see Benchmark_Face)
+TRAIN_SAMPLE = 64  # Rows sampled per list when training the coarse centroids
+
+
+class IVFIndex:
+    """Inverted-file index over gallery rows, pure NumPy.
+
+    Rows are clustered around coarse centroids; each cluster's row ids are
+    stored contiguously in `order`, delimited by `offsets`. A query only scans
+    the rows of its n_probe nearest clusters, and those candidates are then
+    re-ranked with exact distances by the gallery.
+    """
+
+    def __init__(self, centroids, order, offsets):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.order = order
+        self.offsets = offsets
+        self._centroid_norms = np.einsum('ij,ij->i', self.centroids, self.centroids)
+
+    def __len__(self):
+        return len(self.order)
+
+    @classmethod
+    def build(cls, encodings, n_lists=None, seed=0):
+        """Cluster the gallery rows into roughly sqrt(N) inverted lists"""
+        encodings = np.asarray(encodings, dtype=np.float32)
+        n_lists = n_lists or max(1, int(np.sqrt(len(encodings))))
+        n_lists = min(n_lists, len(encodings))
+
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(encodings), n_lists * TRAIN_SAMPLE)
+        sample = encodings[rng.choice(len(encodings), sample_size, replace=False)]
+        centroids = kmeans(sample, n_lists, seed=seed)
+
+        assignment = np.empty(len(encodings), dtype=np.int32)
+        norms = np.einsum('ij,ij->i', centroids, centroids)
+        for start in range(0, len(encodings), 65536):  # Bounded memory on huge galleries
+            block = encodings[start:start + 65536]
+            assignment[start:start + len(block)] = np.argmin(norms[None, :] - 2.0 * block @ centroids.T, axis=1)
+
+        order = np.argsort(assignment, kind='stable').astype(np.int64)
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=len(centroids)), out=offsets[1:])
+        return cls(centroids, order, offsets)
+
+    @classmethod
+    def load(cls, directory, files, mmap=True):
+        """Load the index listed in a gallery manifest, or return None if it has none"""
+        if 'ivf_centroids' not in files:
+            return None
+        mmap_mode = 'r' if mmap else None
+        return cls(np.load(os.path.join(directory, files['ivf_centroids'])),
+                   np.load(os.path.join(directory, files['ivf_order']), mmap_mode=mmap_mode),
+                   np.load(os.path.join(directory, files['ivf_offsets'])))
+
+    def arrays(self):
+        """Arrays to store alongside the gallery, keyed by manifest name"""
+        return {'ivf_centroids': self.centroids,
+                'ivf_order': np.asarray(self.order),
+                'ivf_offsets': np.asarray(self.offsets)}
+
+    def candidates(self, queries, n_probe=N_PROBE):
+        """Candidate rows of all queries as flat (query_ids, rows) arrays, grouped by query"""
+        queries = np.asarray(queries, dtype=np.float32)
+        n_probe = min(n_probe, len(self.centroids))
+        coarse = self._centroid_norms[None, :] - 2.0 * queries @ self.centroids.T
+        if n_probe < len(self.centroids):
+            probes = np.argpartition(coarse, n_probe - 1, axis=1)[:, :n_probe]
+        else:
+            probes = np.broadcast_to(np.arange(len(self.centroids)), coarse.shape)
+
+        # Gather every probed list slice of `order` in one fancy-indexing step
+        starts = self.offsets[probes].ravel()
+        lengths = self.offsets[probes + 1].ravel() - starts
+        total = int(lengths.sum())
+        slice_offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - slice_offsets, lengths) + np.arange(total)
+        query_ids = np.repeat(np.arange(len(queries)), lengths.reshape(probes.shape).sum(axis=1))
+        return query_ids, np.asarray(self.order[positions])
@@ -1,7 +1,8 @@
 import cv2
-import pickle
+import time
 import face_recognition
 import numpy as np
+from Face_Gallery import FaceGallery
 
 # Settings
 TEXT_COLOR = (0, 255, 0)  # Green for recognized
@@ -10,53 +11,250 @@ FONT = cv2.FONT_HERSHEY_SIMPLEX
 FRAME_SCALE = 0.5  # Smaller = Faster
 MIN_CONFIDENCE = 60  # Only accept matches with ≥70% confidence
 
-# Load precomputed encodings
-print("Loading known faces...")
-with open('EncodeFile.p', 'rb') as f:
-    known_data = pickle.load(f)
+# Tracking mode: detect + encode every N frames, follow boxes with optical flow in between
+TRACKING = True
+DETECT_EVERY = 10
+MIN_TRACK_POINTS = 5  # A track with fewer surviving feature points is lost
+TRACK_IOU = 0.5  # Overlap needed for a fresh detection to keep a track's identity
+SHOW_TIMINGS = True
 
-known_encodings = list(known_data.values())
-known_labels = list(known_data.keys())
-print(f"Loaded {len(known_labels)} known faces")
 
-cap = cv2.VideoCapture(0)
+class StageTimings:
+    """Per-frame timings for each pipeline stage, in seconds"""
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
+    def __init__(self):
+        self.last = {}
+        self.totals = {}
+        self.counts = {}
 
-    # Downscale for faster processing
-    small_frame = cv2.resize(frame, (0, 0), fx=FRAME_SCALE, fy=FRAME_SCALE)
-    rgb_small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+    def add(self, stage, seconds):
+        self.last[stage] = self.last.get(stage, 0.0) + seconds
+        self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + 1
 
-    # Find faces in the frame
+    def new_frame(self):
+        self.last = {}
+
+    def averages(self):
+        return {stage: self.totals[stage] / self.counts[stage] for stage in self.totals}
+
+    def summary(self, values=None):
+        values = self.last if values is None else values
+        return " ".join(f"{stage} {seconds * 1000:.1f}ms" for stage, seconds in values.items())
+
+
+def load_gallery():
+    """Load precomputed encodings"""
+    print("Loading known faces...")
+    gallery = FaceGallery.load_default()
+    print(f"Loaded {len(gallery.identities)} known faces")
+    return gallery
+
+
+def detect_faces(rgb_small_frame, timings=None):
+    """Find face boxes (top, right, bottom, left) in a downscaled RGB frame"""
+    start = time.perf_counter()
     face_locations = face_recognition.face_locations(rgb_small_frame, model="hog")
+    if timings is not None:
+        timings.add('detect', time.perf_counter() - start)
+    return face_locations
+
+
+def identify_faces(gallery, rgb_small_frame, face_locations, timings=None):
+    """Encode and match faces; returns [(box, name, confidence)] in small-frame coordinates"""
+    if not face_locations:
+        return []
+
+    start = time.perf_counter()
     face_encodings = face_recognition.face_encodings(rgb_small_frame, face_locations)
+    encoded = time.perf_counter()
+
+    # Compare all faces with the whole gallery in one batch
+    matches = gallery.match(face_encodings, k=1)
+    if timings is not None:
+        timings.add('encode', encoded - start)
+        timings.add('match', time.perf_counter() - encoded)
+
+    detections = []
+    for box, face_matches in zip(face_locations, matches):
+        best_label, best_distance = face_matches[0] if face_matches else ("Unknown", 1.0)
+        confidence = (1 - best_distance) * 100
+        name = best_label if confidence >= MIN_CONFIDENCE else "Unknown"
+        detections.append((tuple(box), name, confidence))
+    return detections
+
+
+def box_iou(a, b):
+    """Intersection over union of two (top, right, bottom, left) boxes"""
+    top, bottom = max(a[0], b[0]), min(a[2], b[2])
+    left, right = max(a[3], b[3]), min(a[1], b[1])
+    inter = max(0, bottom - top) * max(0, right - left)
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    union = area_a + area_b - inter
+    return inter / union if union > 0 else 0.0
+
+
+class FaceTracker:
+    """Follows detected faces between detections with sparse optical flow.
+
+    Each track keeps the name and confidence it was identified with, so faces
+    that are still being followed are never re-encoded.
+    """
+
+    def __init__(self):
+        self.tracks = []  # [{'box', 'name', 'confidence', 'points'}]
+        self.prev_gray = None
+        self.lost = True
+
+    def reset(self, gray, detections):
+        """Start tracking a fresh set of detections"""
+        self.tracks = []
+        for box, name, confidence in detections:
+            top, right, bottom, left = box
+            mask = np.zeros_like(gray)
+            mask[max(top, 0):bottom, max(left, 0):right] = 255
+            points = cv2.goodFeaturesToTrack(gray, maxCorners=30, qualityLevel=0.01,
+                                             minDistance=3, mask=mask)
+            self.tracks.append({'box': box, 'name': name, 'confidence': confidence,
+                                'points': points})
+        self.prev_gray = gray
+        self.lost = False
+
+    def update(self, gray):
+        """Move every track to the new frame; sets `lost` if any track falls apart"""
+        if self.prev_gray is None:
+            self.lost = True
+            return []
+
+        for track in self.tracks:
+            points = track['points']
+            if points is None or len(points) < MIN_TRACK_POINTS:
+                self.lost = True
+                continue
+            new_points, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, points, None)
+            good = status.reshape(-1) == 1
+            if good.sum() < MIN_TRACK_POINTS:
+                self.lost = True
+                track['points'] = None
+                continue
+
+            dx, dy = np.median(new_points[good] - points[good], axis=0).reshape(2)
+            top, right, bottom, left = track['box']
+            track['box'] = (int(round(top + dy)), int(round(right + dx)),
+                            int(round(bottom + dy)), int(round(left + dx)))
+            track['points'] = new_points[good].reshape(-1, 1, 2)
 
-    for (top, right, bottom, left), face_encoding in zip(face_locations, face_encodings):
-        # Compare with known faces
-        face_distances = face_recognition.face_distance(known_encodings, face_encoding)
-        best_match_idx = np.argmin(face_distances)
-        confidence = (1 - face_distances[best_match_idx]) * 100
+        self.prev_gray = gray
+        return self.detections()
 
+    def detections(self):
+        return [(t['box'], t['name'], t['confidence']) for t in self.tracks if t['points'] is not None]
 
-        if confidence >= MIN_CONFIDENCE:
-            name = known_labels[best_match_idx]
-            color = TEXT_COLOR
-            print("User",name,"has been detected with a confidence level of ",confidence)
+    def known_identity(self, box):
+        """Name and confidence of a recognized track overlapping box, or None"""
+        for track in self.tracks:
+            if track['name'] != "Unknown" and box_iou(track['box'], box) >= TRACK_IOU:
+                return track['name'], track['confidence']
+        return None
+
+
+def redetect(gallery, tracker, rgb_small_frame, timings=None):
+    """Run detection, keeping identities of faces that are already being tracked"""
+    face_locations = detect_faces(rgb_small_frame, timings)
+
+    detections, new_locations = [], []
+    for box in face_locations:
+        identity = tracker.known_identity(box)
+        if identity is not None:
+            detections.append((tuple(box), *identity))
         else:
-            name = "Unknown"
-            color = UNKNOWN_COLOR
+            new_locations.append(box)
+    detections.extend(identify_faces(gallery, rgb_small_frame, new_locations, timings))
+    return detections
+
+
+def draw_detections(frame, detections):
+    """Draw boxes and labels, scaling small-frame boxes back to the full frame"""
+    for (top, right, bottom, left), name, confidence in detections:
+        color = TEXT_COLOR if name != "Unknown" else UNKNOWN_COLOR
 
         # Scale back to original frame size
         top, right, bottom, left = [int(x / FRAME_SCALE) for x in [top, right, bottom, left]]
         cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
         cv2.putText(frame, f"{name} ({confidence:.1f}%)", (left, top - 10), FONT, 0.5, color, 1)
 
-    cv2.imshow("Face Recognition", frame)
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
 
-cap.release()
-cv2.destroyAllWindows()
+class FrameProcessor:
+    """Turns BGR frames into detections, in tracking or detect-every-frame mode"""
+
+    def __init__(self, gallery, tracking=TRACKING, detect_every=DETECT_EVERY):
+        self.gallery = gallery
+        self.tracking = tracking
+        self.detect_every = detect_every
+        self.tracker = FaceTracker()
+        self.timings = StageTimings()
+        self.frame_idx = 0
+        self.announced = set()
+
+    def process(self, frame):
+        """Return [(box, name, confidence)] for a frame, boxes in small-frame coordinates"""
+        timings = self.timings
+        timings.new_frame()
+
+        # Downscale for faster processing
+        small_frame = cv2.resize(frame, (0, 0), fx=FRAME_SCALE, fy=FRAME_SCALE)
+        rgb_small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+
+        if not self.tracking:
+            detections = identify_faces(self.gallery, rgb_small_frame,
+                                        detect_faces(rgb_small_frame, timings), timings)
+        else:
+            tracker = self.tracker
+            gray = cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY)
+            detections = None
+            if self.frame_idx % self.detect_every and not tracker.lost:
+                start = time.perf_counter()
+                detections = tracker.update(gray)
+                timings.add('track', time.perf_counter() - start)
+            if detections is None or tracker.lost:
+                detections = redetect(self.gallery, tracker, rgb_small_frame, timings)
+                start = time.perf_counter()
+                tracker.reset(gray, detections)
+                timings.add('track', time.perf_counter() - start)
+        self.frame_idx += 1
+
+        for _, name, confidence in detections:
+            if name != "Unknown" and name not in self.announced:
+                print("User", name, "has been detected with a confidence level of ", confidence)
+        self.announced = {name for _, name, _ in detections}
+        return detections
+
+
+def main(tracking=TRACKING, detect_every=DETECT_EVERY):
+    processor = FrameProcessor(load_gallery(), tracking, detect_every)
+    timings = processor.timings
+
+    cap = cv2.VideoCapture(0)
+
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        detections = processor.process(frame)
+
+        draw_detections(frame, detections)
+        if SHOW_TIMINGS:
+            cv2.putText(frame, timings.summary(), (10, 20), FONT, 0.5, TEXT_COLOR, 1)
+
+        cv2.imshow("Face Recognition", frame)
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
+
+    print(f"Average stage timings: {timings.summary(timings.averages())}")
+    cap.release()
+    cv2.destroyAllWindows()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import os
+import re
+import json
+import threading
+from collections import namedtuple
+from Utterance_Cache import UtteranceCache
+
+# Configuration
+LEXICON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Lexicon.json')
+
+# Words, keeping contractions like "don't" together
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+Hit = namedtuple('Hit', 'phrase category weight start data')
+
+
+def tokenize(text):
+    """Lowercase word tokens, with curly apostrophes normalized"""
+    return TOKEN_PATTERN.findall(text.lower().replace('’', "'"))
+
+
+class LexiconMatch:
+    """All lexicon hits for one text, grouped by category"""
+
+    def __init__(self, hits, token_count):
+        self.all = hits
+        self.token_count = token_count
+        self.by_category = {}
+        for hit in hits:
+            self.by_category.setdefault(hit.category, []).append(hit)
+
+    def has(self, category):
+        return category in self.by_category
+
+    def hits(self, category):
+        return self.by_category.get(category, [])
+
+    def max_weight(self, category, default=0):
+        hits = self.hits(category)
+        return max(hit.weight for hit in hits) if hits else default
+
+
+class Lexicon:
+    """Phrase lexicon compiled into a trie over word tokens.
+
+    A single pass over the text's tokens reports every phrase of every
+    category, including overlapping ones ("help" and "help me"). Phrases only
+    match whole words, so "hi" no longer fires inside "this", and the cost per
+    utterance depends on the text length, not on the number of entries.
+    """
+
+    def __init__(self, categories):
+        self.trie = {}
+        self.max_length = 0
+        self.phrases = {}  # category -> phrases, for bulk matching outside the trie
+        for category, spec in categories.items():
+            default_weight = spec.get('weight', 1)
+            for entry in spec['phrases']:
+                if isinstance(entry, str):
+                    entry = {'phrase': entry}
+                data = {k: v for k, v in entry.items() if k not in ('phrase', 'weight')}
+                self.add(entry['phrase'], category, entry.get('weight', default_weight), data)
+
+    @classmethod
+    def load(cls, path=LEXICON_FILE):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def add(self, phrase, category, weight=1, data=None):
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        node = self.trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(None, []).append((phrase, category, weight, data or {}))
+        self.phrases.setdefault(category, []).append(phrase)
+        self.max_length = max(self.max_length, len(tokens))
+
+    def find(self, text):
+        """Every (phrase, category, weight, start, data) hit in text, in order of position"""
+        tokens = tokenize(text)
+        hits = []
+        for start in range(len(tokens)):
+            node = self.trie
+            for token in tokens[start:start + self.max_length]:
+                node = node.get(token)
+                if node is None:
+                    break
+                for phrase, category, weight, data in node.get(None, ()):
+                    hits.append(Hit(phrase, category, weight, start, data))
+        return hits, len(tokens)
+
+    def match(self, text):
+        return LexiconMatch(*self.find(text or ""))
+
+
+_lexicon = None
+_lexicon_lock = threading.Lock()
+# Residents repeat themselves a lot; hits per utterance are pure, so memoize them
+match_cache = UtteranceCache('lexicon')
+
+
+def get_lexicon():
+    """The shared lexicon loaded from Lexicon.json"""
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                _lexicon = Lexicon.load()
+    return _lexicon
+
+
+def match_text(text):
+    """Lexicon hits for text, served from the utterance cache when repeated"""
+    return match_cache.get_or_compute(text or "", get_lexicon().match)
@@ -0,0 +1,239 @@
+import time
+import queue
+import contextlib
+import threading
+import numpy as np
+import speech_recognition as sr
+from Speech_Backends import AudioStream, SAMPLE_RATE
+
+# Configuration
+FRAME_MS = 30  # VAD decision granularity
+RING_SECONDS = 30  # Captured audio kept for segments that are still being read
+PRE_ROLL = 0.3  # Seconds kept before detected speech, so first syllables survive
+HANGOVER = 0.3  # Seconds of silence that end an utterance
+MIN_SPEECH = 0.09  # Seconds above the threshold before a segment opens
+MAX_UTTERANCE = 15.0  # Seconds; longer speech is cut into several segments
+CALIBRATION = 0.5  # Seconds of audio that seed the noise floor, once at start
+START_RATIO = 3.0  # Speech starts at this multiple of the noise floor RMS (~10 dB)
+STOP_RATIO = 2.0  # and ends below this one, so trailing words are not chopped
+MIN_ENERGY = 100.0  # RMS floor for the threshold in a silent room
+NOISE_ADAPT = 0.05  # Noise floor EMA weight of each non-speech frame
+STALE_SEGMENT = 5.0  # Finished utterances older than this are not handed out
+
+
+class AudioRing:
+    """Fixed-size ring buffer of int16 samples addressed by absolute sample index"""
+
+    def __init__(self, size):
+        self.buffer = np.zeros(size, dtype=np.int16)
+        self.size = size
+        self.written = 0  # Samples written since start
+
+    @property
+    def oldest(self):
+        return max(0, self.written - self.size)
+
+    def write(self, samples):
+        n = len(samples)
+        pos = self.written % self.size
+        first = min(n, self.size - pos)
+        self.buffer[pos:pos + first] = samples[:first]
+        self.buffer[:n - first] = samples[first:]
+        self.written += n
+
+    def read(self, start, end):
+        """Samples [start, end) as bytes; start is clamped to what is still buffered"""
+        start = max(start, self.oldest)
+        if end <= start:
+            return b''
+        pos, n = start % self.size, end - start
+        first = min(n, self.size - pos)
+        if first == n:
+            return self.buffer[pos:pos + n].tobytes()
+        return self.buffer[pos:].tobytes() + self.buffer[:n - first].tobytes()
+
+
+class Segment:
+    """One utterance in the ring; end stays None while the speaker is still talking"""
+
+    def __init__(self, start, started_at):
+        self.start = start
+        self.end = None
+        self.started_at = started_at
+        self.ended_at = None
+
+
+class MicrophoneStream:
+    """Long-lived microphone capture with energy VAD that segments utterances.
+
+    A capture thread keeps the device open, writes every frame into a ring
+    buffer and tracks the background noise floor continuously, so turns pay
+    neither device-open nor calibration time. When speech starts, a Segment
+    (including PRE_ROLL of audio before the trigger) is queued right away and
+    its audio can be streamed to the recognizer while the resident is still
+    talking. This object is a recognizer source: see open_utterance().
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS):
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_seconds = self.frame_samples / sample_rate
+        self.ring = AudioRing(int(RING_SECONDS * sample_rate))
+        self.segments = queue.Queue()
+        self.written = threading.Condition()
+        self.noise_floor = None
+        self.running = False
+        self.thread = None
+        self.error = None
+        self.paused = False
+        self.segment_count = 0
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.thread = threading.Thread(target=self._capture, daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        with self.written:
+            self.written.notify_all()
+
+    @contextlib.contextmanager
+    def pause(self):
+        """Keep capturing but open no segments, e.g. while AlziE itself is speaking"""
+        self.paused = True
+        try:
+            yield
+        finally:
+            self.paused = False
+
+    def _capture(self):
+        try:
+            with sr.Microphone(sample_rate=self.sample_rate, chunk_size=self.frame_samples) as mic:
+                def frames():
+                    while self.running:
+                        yield mic.stream.read(self.frame_samples)
+                self._detect(frames())
+        except Exception as e:
+            self.error = e
+            print(f"Microphone capture stopped: {e}")
+        finally:
+            self.running = False
+            with self.written:
+                self.written.notify_all()
+
+    def _detect(self, frames):
+        """Run the VAD over raw frames, writing them to the ring and opening/closing segments"""
+        calibration_frames = max(1, int(CALIBRATION / self.frame_seconds))
+        preroll = int(PRE_ROLL * self.sample_rate)
+        min_speech = max(1, round(MIN_SPEECH / self.frame_seconds))
+        hangover = max(1, round(HANGOVER / self.frame_seconds))
+        max_frames = int(MAX_UTTERANCE / self.frame_seconds)
+
+        calibration = []
+        segment = None
+        loud = quiet = 0
+        energies = []
+
+        for frame in frames:
+            samples = np.frombuffer(frame, dtype=np.int16)
+            energy = float(np.sqrt(np.mean(samples.astype(np.float32) ** 2))) if len(samples) else 0.0
+            frame_start = self.ring.written
+            with self.written:
+                self.ring.write(samples)
+                self.written.notify_all()
+
+            if self.noise_floor is None:
+                calibration.append(energy)
+                if len(calibration) >= calibration_frames:
+                    self.noise_floor = float(np.median(calibration))
+                continue
+
+            if self.paused:
+                loud = 0
+                if segment is not None:
+                    self._close(segment)
+                    segment = None
+                continue
+
+            if segment is None:
+                if energy > max(self.noise_floor * START_RATIO, MIN_ENERGY):
+                    loud += 1
+                    if loud >= min_speech:
+                        speech_start = frame_start - (loud - 1) * self.frame_samples
+                        segment = Segment(max(self.ring.oldest, speech_start - preroll), time.time())
+                        energies = []
+                        quiet = 0
+                        self.segment_count += 1
+                        self.segments.put(segment)
+                else:
+                    loud = 0
+                    self.noise_floor += NOISE_ADAPT * (energy - self.noise_floor)
+                continue
+
+            energies.append(energy)
+            quiet = quiet + 1 if energy < max(self.noise_floor * STOP_RATIO, MIN_ENERGY) else 0
+            if quiet >= hangover or len(energies) >= max_frames:
+                if len(energies) >= max_frames and quiet == 0:
+                    # Sustained "speech" this long is more likely new background noise
+                    self.noise_floor = max(self.noise_floor, float(np.percentile(energies, 10)))
+                self._close(segment)
+                segment = None
+                loud = 0
+
+    def _close(self, segment):
+        with self.written:
+            segment.end = self.ring.written
+            segment.ended_at = time.time()
+            self.written.notify_all()
+
+    def next_segment(self, timeout=None):
+        """The next utterance Segment, or None if nobody spoke within timeout seconds"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                segment = self.segments.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            # Skip speech nobody was listening for, it would answer a stale question
+            if segment.ended_at is None or time.time() - segment.ended_at < STALE_SEGMENT:
+                return segment
+
+    def segment_chunks(self, segment):
+        """Yield a segment's audio as it is captured, until the VAD closes it"""
+        position = segment.start
+        while True:
+            with self.written:
+                while (self.ring.written <= position and segment.end is None
+                       and self.running):
+                    self.written.wait(timeout=0.5)
+                end = self.ring.written if segment.end is None else segment.end
+                data = self.ring.read(position, end)
+            position = end
+            if data:
+                yield data
+            if segment.end is not None and position >= segment.end:
+                return
+            if not self.running and segment.end is None:
+                return
+
+    def open_utterance(self, timeout=None):
+        """AudioStream of the next utterance, streamed live from the ring"""
+        if not self.running:
+            self.start()
+        segment = self.next_segment(timeout)
+        if segment is None:
+            return None
+        return AudioStream(self.sample_rate, self.segment_chunks(segment), None)
+
+    def stats(self):
+        return {
+            'segments': self.segment_count,
+            'noise_floor': self.noise_floor,
+            'queued': self.segments.qsize(),
+        }
@@ -0,0 +1,217 @@
+import io
+import os
+import wave
+import queue
+import itertools
+import threading
+import numpy as np
+from pygame import mixer
+
+# Configuration
+MIXER_FREQUENCY = 22050
+MIXER_BUFFER = 1024  # Samples; small enough that playback starts within ~50 ms
+DUCK_LEVEL = 0.25  # Music volume multiplier while speech is playing
+POLL_INTERVAL = 0.01  # Seconds between end-of-clip checks on the playback thread
+URGENT, SPEECH, BACKGROUND = 0, 1, 2  # Priorities; URGENT interrupts whatever is playing
+
+
+def pcm_to_wav(samples, sample_rate, channels=1):
+    """Wrap int16 PCM (bytes or array) in an in-memory WAV so the mixer can resample it"""
+    data = np.asarray(samples, dtype=np.int16).tobytes() if not isinstance(samples, bytes) else samples
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(data)
+    return buffer.getvalue()
+
+
+class Playback:
+    """Handle for one queued clip; wait() on it or pass on_done instead of sleeping"""
+
+    def __init__(self, audio, priority, on_done=None, duck=True, label=None, on_start=None):
+        self.audio = audio
+        self.priority = priority
+        self.on_done = on_done
+        self.on_start = on_start
+        self.duck = duck
+        self.label = label
+        self.state = 'queued'  # -> playing -> done | interrupted | cancelled
+        self.finished = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the clip has finished, been interrupted or cancelled"""
+        return self.finished.wait(timeout)
+
+    def cancel(self):
+        if self.state == 'queued':
+            self._finish('cancelled')
+
+    def _start(self):
+        if self.on_start is not None:
+            try:
+                self.on_start(self)
+            except Exception as e:
+                print(f"Playback callback error: {e}")
+
+    def _finish(self, state):
+        if self.finished.is_set():
+            return
+        self.state = state
+        self.finished.set()
+        if self.on_done is not None:
+            try:
+                self.on_done(self)
+            except Exception as e:
+                print(f"Playback callback error: {e}")
+
+
+class PlaybackEngine:
+    """In-process audio output: one speech channel fed from a priority queue.
+
+    Clips are WAV bytes (e.g. from the TTS phrase cache), raw PCM arrays via
+    pcm_to_wav, or file paths. They are decoded in memory and played on a
+    reserved mixer channel, so there is no temp file, subprocess or fixed
+    sleep per utterance. Background music is ducked while speech plays, and
+    an URGENT clip (or interrupt()) cuts off the current one.
+    """
+
+    def __init__(self):
+        if not mixer.get_init():
+            mixer.init(frequency=MIXER_FREQUENCY, size=-16, channels=2, buffer=MIXER_BUFFER)
+        mixer.set_reserved(1)  # Sound.play() elsewhere never steals the speech channel
+        self.channel = mixer.Channel(0)
+        self.queue = queue.PriorityQueue()
+        self.order = itertools.count()
+        self.current = None
+        self.music_volume = None  # Level to restore after ducking
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def play(self, audio, priority=SPEECH, on_done=None, duck=True, interrupt=False, label=None,
+             on_start=None):
+        """Queue a clip and return its Playback handle right away
+
+        on_start(playback) runs on the playback thread when the clip starts
+        sounding, on_done(playback) when it has finished or was stopped.
+        """
+        playback = Playback(audio, priority, on_done, duck, label, on_start)
+        self.queue.put((priority, next(self.order), playback))
+        with self.lock:
+            current = self.current
+        if current is not None and (interrupt or priority == URGENT and current.priority > URGENT):
+            self.interrupt()
+        self.wakeup.set()
+        return playback
+
+    def interrupt(self, clear=False):
+        """Stop the clip that is playing; with clear=True drop everything queued too"""
+        if clear:
+            while True:
+                try:
+                    _, _, playback = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                playback.cancel()
+        with self.lock:
+            current = self.current
+        if current is not None:
+            current.state = 'interrupting'
+            self.channel.stop()
+        self.wakeup.set()
+
+    def is_busy(self):
+        return self.current is not None or not self.queue.empty()
+
+    def close(self):
+        self.running = False
+        self.interrupt(clear=True)
+        self.thread.join(timeout=1.0)
+
+    def _sound(self, audio):
+        if isinstance(audio, mixer.Sound):
+            return audio
+        if isinstance(audio, (bytes, bytearray)):
+            return mixer.Sound(file=io.BytesIO(audio))
+        return mixer.Sound(audio)  # A file path
+
+    def _duck(self):
+        if self.music_volume is None and mixer.music.get_busy():
+            self.music_volume = mixer.music.get_volume()
+            mixer.music.set_volume(self.music_volume * DUCK_LEVEL)
+
+    def _unduck(self):
+        if self.music_volume is not None:
+            mixer.music.set_volume(self.music_volume)
+            self.music_volume = None
+
+    def _run(self):
+        while self.running:
+            try:
+                _, _, playback = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                self._unduck()
+                continue
+            if playback.finished.is_set():
+                continue  # Cancelled while queued
+
+            try:
+                sound = self._sound(playback.audio)
+            except Exception as e:
+                print(f"Error loading audio: {e}")
+                playback._finish('cancelled')
+                continue
+
+            if playback.duck:
+                self._duck()
+            with self.lock:
+                self.current = playback
+                playback.state = 'playing'
+            self.channel.play(sound)
+            playback._start()
+            self.wakeup.clear()
+            while self.channel.get_busy() and playback.state == 'playing':
+                self.wakeup.wait(POLL_INTERVAL)
+                self.wakeup.clear()
+            with self.lock:
+                self.current = None
+            playback._finish('interrupted' if playback.state == 'interrupting' else 'done')
+
+            if self.queue.empty():
+                self._unduck()
+
+
+def play_files(paths, delete_after=False, engine=None):
+    """Queue audio files in order and return the handle of the last one (or None)"""
+    engine = engine or get_engine()
+
+    def finished(playback):
+        if delete_after and playback.state != 'cancelled':
+            try:
+                os.remove(playback.audio)
+                print(f"Deleted: {os.path.basename(playback.audio)}")
+            except OSError as e:
+                print(f"Error deleting {playback.audio}: {e}")
+
+    last = None
+    for path in paths:
+        last = engine.play(path, on_done=finished, label=os.path.basename(path))
+    return last
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """The shared playback engine, started on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = PlaybackEngine()
+    return _engine
@@ -0,0 +1,136 @@
+import cv2
+import time
+import queue
+import threading
+import numpy as np
+from collections import deque
+from Facial_Recognition import (FrameProcessor, load_gallery, draw_detections,
+                                FONT, TEXT_COLOR, UNKNOWN_COLOR, SHOW_TIMINGS,
+                                TRACKING, DETECT_EVERY)
+
+# Settings
+LATENCY_TARGET = 0.200  # Seconds from capture to overlay
+LATENCY_WINDOW = 100  # Frames used for the rolling latency report
+REPORT_EVERY = 100  # Frames between latency printouts
+
+
+class LatestQueue:
+    """Single-slot queue: putting a new item replaces one that was never taken"""
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=1)
+        self.dropped = 0
+
+    def put(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        return self._queue.get(timeout=timeout)
+
+    def get_nowait(self):
+        return self._queue.get_nowait()
+
+
+class RecognitionPipeline:
+    """Capture, inference and display on separate stages.
+
+    The capture thread only ever hands over the newest frame, so a slow
+    inference skips stale frames instead of queueing them up. The render
+    stage runs on the main thread because cv2.imshow must.
+    """
+
+    def __init__(self, source=0, tracking=TRACKING, detect_every=DETECT_EVERY):
+        self.source = source
+        self.processor = FrameProcessor(load_gallery(), tracking, detect_every)
+        self.frames = LatestQueue()
+        self.results = LatestQueue()
+        self.stop_event = threading.Event()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def capture_loop(self, cap):
+        while not self.stop_event.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                self.stop_event.set()
+                break
+            self.frames.put((time.perf_counter(), frame))
+
+    def inference_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                captured_at, frame = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            detections = self.processor.process(frame)
+            self.results.put((captured_at, frame, detections, dict(self.processor.timings.last)))
+
+    def latency_stats(self):
+        """Rolling capture-to-overlay latency in seconds: (mean, p50, p95)"""
+        recent = np.array(self.latencies)
+        if not len(recent):
+            return 0.0, 0.0, 0.0
+        return float(recent.mean()), float(np.percentile(recent, 50)), float(np.percentile(recent, 95))
+
+    def run(self):
+        cap = cv2.VideoCapture(self.source)
+        threads = [threading.Thread(target=self.capture_loop, args=(cap,), daemon=True),
+                   threading.Thread(target=self.inference_loop, daemon=True)]
+        for thread in threads:
+            thread.start()
+
+        rendered = 0
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    captured_at, frame, detections, stage_times = self.results.get(timeout=0.1)
+                except queue.Empty:
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+                    continue
+
+                draw_detections(frame, detections)
+                latency = time.perf_counter() - captured_at
+                self.latencies.append(latency)
+                rendered += 1
+
+                color = TEXT_COLOR if latency <= LATENCY_TARGET else UNKNOWN_COLOR
+                cv2.putText(frame, f"latency {latency * 1000:.0f}ms", (10, 40), FONT, 0.5, color, 1)
+                if SHOW_TIMINGS:
+                    cv2.putText(frame, self.processor.timings.summary(stage_times), (10, 20),
+                                FONT, 0.5, TEXT_COLOR, 1)
+                cv2.imshow("Face Recognition", frame)
+
+                if rendered % REPORT_EVERY == 0:
+                    mean, p50, p95 = self.latency_stats()
+                    print(f"Latency mean {mean * 1000:.0f}ms, p50 {p50 * 1000:.0f}ms, "
+                          f"p95 {p95 * 1000:.0f}ms; dropped {self.frames.dropped} stale frames")
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+        finally:
+            self.stop_event.set()
+            for thread in threads:
+                thread.join(timeout=1.0)
+            cap.release()
+            cv2.destroyAllWindows()
+
+        mean, p50, p95 = self.latency_stats()
+        print(f"Capture-to-overlay latency: mean {mean * 1000:.0f}ms, p50 {p50 * 1000:.0f}ms, "
+              f"p95 {p95 * 1000:.0f}ms over the last {len(self.latencies)} frames")
+        timings = self.processor.timings
+        print(f"Average stage timings: {timings.summary(timings.averages())}")
+
+
+def main(source=0):
+    RecognitionPipeline(source).run()
+
+if __name__ == "__main__":
+    main()
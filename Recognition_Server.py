@@ -0,0 +1,186 @@
+import cv2
+import json
+import time
+import queue
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from Face_Gallery import FaceGallery, GALLERY_DIR
+from Facial_Recognition import FRAME_SCALE
+from Batch_Recognition import recognize_frames
+from Recognition_Pipeline import LatestQueue
+
+# Settings
+RELOAD_CHECK_INTERVAL = 1.0  # Seconds between checks for a newly saved gallery
+RECONNECT_DELAY = 2.0  # Seconds before reopening a camera that stopped delivering
+STATS_INTERVAL = 30.0  # Seconds between per-stream throughput reports
+
+_gallery = None  # One memory-mapped gallery per worker process
+
+
+def _init_worker(gallery_dir):
+    global _gallery
+    cv2.setNumThreads(1)
+    _gallery = FaceGallery.load_default(gallery_dir)
+
+
+def _recognize(gallery_dir, version, stream_id, frame_idx, timestamp, rgb, scale):
+    """Worker task: switch to the requested gallery version if needed, then recognize one frame"""
+    global _gallery
+    if version is not None and _gallery.version != version:
+        # Memory-mapped, so reloading only maps the new files
+        _gallery = FaceGallery.load(gallery_dir)
+    records = recognize_frames(_gallery, [(frame_idx, timestamp, rgb)], scale)
+    for record in records:
+        record['stream'] = stream_id
+    return records
+
+
+class CameraStream:
+    """Capture thread for one camera that only keeps its newest downscaled frame"""
+
+    def __init__(self, stream_id, source, scale=FRAME_SCALE):
+        self.stream_id = stream_id
+        self.source = int(source) if str(source).isdigit() else source
+        self.scale = scale
+        self.frames = LatestQueue()
+        self.processed = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _loop(self):
+        frame_idx = 0
+        while not self.stop_event.is_set():
+            cap = cv2.VideoCapture(self.source)
+            while not self.stop_event.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                small = cv2.resize(frame, (0, 0), fx=self.scale, fy=self.scale)
+                self.frames.put((frame_idx, time.time(), cv2.cvtColor(small, cv2.COLOR_BGR2RGB)))
+                frame_idx += 1
+            cap.release()
+            if not self.stop_event.is_set():
+                print(f"Camera {self.stream_id} stopped delivering frames, reconnecting...")
+                self.stop_event.wait(RECONNECT_DELAY)
+
+
+class RecognitionServer:
+    """Recognizes faces from many cameras with one shared worker pool.
+
+    Frames are scheduled round-robin, with at most one frame in flight per
+    camera, so a busy camera cannot starve the others. Workers memory-map the
+    gallery, so its pages are shared between them instead of being copied into
+    each process. When Encode_Generator saves a new gallery version, new tasks
+    carry the new version and each worker switches over on its next frame.
+    Cameras keep streaming throughout.
+    """
+
+    def __init__(self, sources, workers=None, gallery_dir=GALLERY_DIR, scale=FRAME_SCALE,
+                 on_detections=None):
+        self.streams = [CameraStream(str(i), source, scale) for i, source in enumerate(sources)]
+        self.workers = workers or len(self.streams)
+        self.gallery_dir = gallery_dir
+        self.scale = scale
+        self.on_detections = on_detections or self.print_detections
+        self.version = self._current_version()
+        self.in_flight = set()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+    def _current_version(self):
+        manifest = FaceGallery.read_manifest(self.gallery_dir)
+        return manifest['version'] if manifest else None
+
+    @staticmethod
+    def print_detections(stream_id, records):
+        for record in records:
+            print(json.dumps(record))
+
+    def _done(self, stream, future):
+        with self.lock:
+            self.in_flight.discard(stream.stream_id)
+        try:
+            records = future.result()
+        except Exception as e:
+            print(f"Recognition error on camera {stream.stream_id}: {e}")
+            return
+        stream.processed += 1
+        if records:
+            self.on_detections(stream.stream_id, records)
+
+    def _schedule(self, executor, start):
+        """Submit the newest frame of each idle camera, starting at index `start`"""
+        submitted = 0
+        for offset in range(len(self.streams)):
+            stream = self.streams[(start + offset) % len(self.streams)]
+            with self.lock:
+                if stream.stream_id in self.in_flight or len(self.in_flight) >= self.workers:
+                    continue
+            try:
+                frame_idx, timestamp, rgb = stream.frames.get_nowait()
+            except queue.Empty:
+                continue
+            with self.lock:
+                self.in_flight.add(stream.stream_id)
+            future = executor.submit(_recognize, self.gallery_dir, self.version, stream.stream_id,
+                                     frame_idx, timestamp, rgb, self.scale)
+            future.add_done_callback(lambda f, s=stream: self._done(s, f))
+            submitted += 1
+        return submitted
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        for stream in self.streams:
+            stream.start()
+        print(f"Serving {len(self.streams)} cameras with {self.workers} workers")
+
+        last_reload_check = last_stats = time.perf_counter()
+        counts = {stream.stream_id: 0 for stream in self.streams}
+        rotation = 0
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.gallery_dir,)) as executor:
+            try:
+                while not self.stop_event.is_set():
+                    if not self._schedule(executor, rotation):
+                        time.sleep(0.005)
+                    rotation = (rotation + 1) % len(self.streams)
+
+                    now = time.perf_counter()
+                    if now - last_reload_check >= RELOAD_CHECK_INTERVAL:
+                        last_reload_check = now
+                        version = self._current_version()
+                        if version != self.version:
+                            print(f"Gallery updated to version {version}, switching workers over")
+                            self.version = version
+                    if now - last_stats >= STATS_INTERVAL:
+                        rates = ", ".join(f"cam {s.stream_id}: {(s.processed - counts[s.stream_id]) / (now - last_stats):.1f} fps"
+                                          for s in self.streams)
+                        print(f"Throughput {rates}")
+                        counts = {s.stream_id: s.processed for s in self.streams}
+                        last_stats = now
+            except KeyboardInterrupt:
+                pass
+            finally:
+                for stream in self.streams:
+                    stream.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Face recognition service for several cameras")
+    parser.add_argument('sources', nargs='+', help="Camera indexes or stream URLs")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per camera)")
+    parser.add_argument('--scale', type=float, default=FRAME_SCALE, help="Downscale factor before detection")
+    args = parser.parse_args()
+    RecognitionServer(args.sources, args.workers, scale=args.scale).run()
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,118 @@
-import nltk
-nltk.download('stopwords')
-nltk.download('punkt')
-import spacy
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from nltk.stem.porter import PorterStemmer
-from spacytextblob.spacytextblob import SpacyTextBlob
-
-s = PorterStemmer()
-l = WordNetLemmatizer()
-nlp = spacy.load("en_core_web_sm")
-nlp.add_pipe("spacytextblob")
-
-HARMFUL_PHRASES = {
-    "kill yourself": {"polarity": -1.0, "sentiment": "Emergency Negative"},
-    "self harm": {"polarity": -1.0, "sentiment": "Emergency Negative"},
-    "i hate you": {"polarity": -1.0, "sentiment": "Emergency Negative"},
-    "i don't know who": {"polarity": -0.9, "sentiment": "Distressed User"},
-    "i don't know where": {"polarity": -0.9, "sentiment": "Distressed User"},
-    "don't remember": {"polarity": -0.9, "sentiment": "Distressed User"},
-}
+import os
+import time
+import threading
+from Lexicon import match_text
+from Utterance_Cache import UtteranceCache
+
+# Models are loaded from a bundled folder on first use, never downloaded at
+# runtime, so importing this module is cheap and works on air-gapped units.
+# Populate the folder once with: python Sentiment_analysis.py --download-models
+MODELS_DIR = os.environ.get('ALZIE_MODELS_DIR',
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Models'))
+NLTK_DATA_DIR = os.path.join(MODELS_DIR, 'nltk_data')
+SPACY_MODEL_DIR = os.path.join(MODELS_DIR, 'en_core_web_sm')
+
+_nlp = None
+_stop_words = None
+_load_lock = threading.Lock()
+LOAD_TIMES = {}  # Seconds spent loading each resource, see startup_stats()
+
+def get_nlp():
+    """The spaCy pipeline, loaded on first use"""
+    global _nlp
+    if _nlp is None:
+        with _load_lock:
+            if _nlp is None:
+                start = time.perf_counter()
+                import spacy
+                model = SPACY_MODEL_DIR if os.path.isdir(SPACY_MODEL_DIR) else "en_core_web_sm"
+                # Only the tagger/lemmatizer are used, so skip dependency parsing and NER
+                _nlp = spacy.load(model, disable=["parser", "ner"])
+                LOAD_TIMES['spacy'] = time.perf_counter() - start
+    return _nlp
+
+def get_stop_words():
+    """NLTK's English stopwords as a frozenset, loaded on first use"""
+    global _stop_words
+    if _stop_words is None:
+        with _load_lock:
+            if _stop_words is None:
+                start = time.perf_counter()
+                import nltk
+                if os.path.isdir(NLTK_DATA_DIR) and NLTK_DATA_DIR not in nltk.data.path:
+                    nltk.data.path.insert(0, NLTK_DATA_DIR)
+                try:
+                    from nltk.corpus import stopwords
+                    words = stopwords.words("english")
+                except LookupError:
+                    print(f"NLTK stopwords not found in {NLTK_DATA_DIR}, using spaCy's list")
+                    from spacy.lang.en.stop_words import STOP_WORDS as words
+                _stop_words = frozenset(words)
+                LOAD_TIMES['stopwords'] = time.perf_counter() - start
+    return _stop_words
+
+def __getattr__(name):
+    # Keep `Sentiment_analysis.nlp` / `.STOP_WORDS` working without eager loading
+    if name == 'nlp':
+        return get_nlp()
+    if name == 'STOP_WORDS':
+        return get_stop_words()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def prewarm(background=True):
+    """Load every model ahead of the first utterance.
+
+    With background=True this returns the loading thread, so callers can
+    start it while the microphone calibrates and carry on.
+    """
+    def load():
+        start = time.perf_counter()
+        get_stop_words()
+        get_nlp()
+        from textblob import TextBlob
+        TextBlob("warm up").sentiment  # Loads TextBlob's lexicon
+        LOAD_TIMES['prewarm_total'] = time.perf_counter() - start
+
+    if not background:
+        load()
+        return None
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    return thread
+
+def startup_stats():
+    """Seconds spent loading each resource so far"""
+    return dict(LOAD_TIMES)
+
+def download_models():
+    """Fetch the models into MODELS_DIR once, on a machine with network access"""
+    import nltk
+    import spacy
+    nltk.download('stopwords', download_dir=NLTK_DATA_DIR)
+    spacy.load("en_core_web_sm").to_disk(SPACY_MODEL_DIR)
+    print(f"Models saved to {MODELS_DIR}")
+
+# Defaults for analyze_texts
+BATCH_SIZE = 64
+N_PROCESS = 1
+
+# Sentiment of repeated utterances is served from memory
+sentiment_cache = UtteranceCache('sentiment')
+
+def check_harmful(text):
+    """Return the emergency result if text contains a harmful phrase, else None"""
+    hits = match_text(text).hits('harmful')
+    if not hits:
+        return None
+    # The most severe phrase decides the result
+    hit = min(hits, key=lambda h: h.weight)
+    # Return complete result including processed text
+    return {
+        'original_text': text,
+        'processed_text': text,
+        'polarity': hit.weight,
+        'sentiment': hit.data['sentiment']
+    }
 
 class SentimentAnalyzer:
     def __init__(self, text):
@@ -28,39 +120,40 @@ class SentimentAnalyzer:
         self.lemmatized = None
         self.filtered_text = None
         
-    def lemmatize(self):
-        doc = nlp(self.text)
-        lemmas = [token.lemma_ for token in doc]
+    def _parse(self, doc=None):
+        """Single spaCy pass that yields both the lemmas and the filtered text"""
+        lemmas = [token.lemma_ for token in (doc if doc is not None else get_nlp()(self.text))]
+        stop_words = get_stop_words()
         self.lemmatized = ' '.join(lemmas)
+        self.filtered_text = ' '.join(lemma for lemma in lemmas if lemma not in stop_words)
+
+    def lemmatize(self):
+        if self.lemmatized is None:
+            self._parse()
         return self.lemmatized
     
     def remove_stopwords(self):
-        if not self.lemmatized:
-            self.lemmatize()
-            
-        stop_words = set(stopwords.words("english"))
-        word_tokens = word_tokenize(self.lemmatized)
-        filtered_words = [word for word in word_tokens if word not in stop_words]
-        self.filtered_text = ' '.join(filtered_words)
+        if self.filtered_text is None:
+            self._parse()
         return self.filtered_text
     
     def analyze_sentiment(self):
         # First check for harmful phrases
-        lower_text = self.text.lower()
-        for phrase, data in HARMFUL_PHRASES.items():
-            if phrase in lower_text:
-                # Return complete result including processed text
-                return {
-                    'polarity': data['polarity'],
-                    'sentiment': data['sentiment']
-                }, data['polarity']
+        harmful = check_harmful(self.text)
+        if harmful is not None:
+            return harmful
         
         # Normal processing for non-harmful phrases
-        if not self.filtered_text:
-            self.remove_stopwords()
-            
-        doc = nlp(self.filtered_text)
-        polarity = doc._.blob.polarity
+        return self._score()
+
+    def _score(self, doc=None):
+        """Polarity and sentiment label, optionally from an already parsed doc"""
+        if self.filtered_text is None:
+            self._parse(doc)
+
+        # TextBlob directly on the filtered text, no second spaCy parse
+        from textblob import TextBlob
+        polarity = TextBlob(self.filtered_text).sentiment.polarity
         
         if polarity > 0.2:
             sentiment = "Positive"
@@ -76,13 +169,63 @@ class SentimentAnalyzer:
             'sentiment': sentiment
         }
 
+def _for_text(result, text):
+    """Copy of a cached result with this utterance's own original text"""
+    return dict(result, original_text=text)
+
 def analyze_text(text):
-    analyzer = SentimentAnalyzer(text)
-    return analyzer.analyze_sentiment()
+    result = sentiment_cache.get_or_compute(text, lambda t: SentimentAnalyzer(t).analyze_sentiment())
+    return _for_text(result, text)
+
+def analyze_texts(texts, batch_size=BATCH_SIZE, n_process=N_PROCESS, on_emergency=None):
+    """Analyze an iterable of texts in bulk, yielding one result per text in input order.
+
+    Texts are parsed with nlp.pipe in batches (optionally across n_process
+    processes). Harmful phrases are checked as each text is read, before it
+    joins a batch, and on_emergency(index, result) is called right away so an
+    emergency line never waits for the rest of its batch to be parsed.
+    Utterances already in the sentiment cache skip parsing entirely.
+    """
+    ready = {}  # index -> result that needed no parsing
+
+    def texts_to_parse():
+        for index, text in enumerate(texts):
+            harmful = check_harmful(text)
+            if harmful is not None:
+                if on_emergency is not None:
+                    on_emergency(index, harmful)
+                ready[index] = harmful
+                continue
+            cached = sentiment_cache.get(text)
+            if cached is not None:
+                ready[index] = _for_text(cached, text)
+                continue
+            yield text, index
+
+    next_index = 0
+    for doc, index in get_nlp().pipe(texts_to_parse(), as_tuples=True,
+                                     batch_size=batch_size, n_process=n_process):
+        while next_index in ready:
+            yield ready.pop(next_index)
+            next_index += 1
+        result = SentimentAnalyzer(doc.text)._score(doc)
+        sentiment_cache.put(doc.text, result)
+        yield _for_text(result, doc.text)
+        next_index += 1
+    while next_index in ready:
+        yield ready.pop(next_index)
+        next_index += 1
 
 if __name__ == "__main__":
+    import sys
+    if '--download-models' in sys.argv:
+        download_models()
+        sys.exit()
+
     from Speech_Recognition import recognize_speech
-    
+
+    # Load the models while the microphone calibrates
+    prewarm()
     speech_text = recognize_speech()  
     if speech_text:
         result = analyze_text(speech_text)
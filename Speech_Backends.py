@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import wave
+import threading
+from collections import namedtuple
+import speech_recognition as sr
+
+# Configuration
+# Recognizer backend: 'google' (online, whole phrase) or 'vosk' (offline, streaming).
+# The Vosk model is unpacked once into Models/, e.g. from
+# https://alphacephei.com/vosk/models (vosk-model-small-en-us-0.15).
+ASR_BACKEND = os.environ.get('ALZIE_ASR_BACKEND', 'google')
+MODELS_DIR = os.environ.get('ALZIE_MODELS_DIR',
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Models'))
+VOSK_MODEL_DIR = os.environ.get('ALZIE_VOSK_MODEL', os.path.join(MODELS_DIR, 'vosk-model-small-en-us'))
+# WAV file or folder of WAV files to use instead of the microphone (test mode)
+AUDIO_SOURCE = os.environ.get('ALZIE_AUDIO_SOURCE')
+SAMPLE_RATE = 16000
+CHUNK_FRAMES = 1600  # 100 ms per WAV read, so partials and endpoints lag by at most that
+ENDPOINT_SILENCE = 0.3  # Seconds of trailing silence that end an utterance (Vosk)
+
+AudioStream = namedtuple('AudioStream', 'sample_rate chunks path')
+
+
+class WavFileSource:
+    """Test mode: each utterance comes from the next WAV file instead of a microphone.
+
+    path is a single file or a folder, read in sorted order. With
+    realtime=True chunks are paced like live audio, for latency measurements.
+    """
+
+    def __init__(self, path, chunk_frames=CHUNK_FRAMES, realtime=False):
+        if os.path.isdir(path):
+            self.paths = sorted(os.path.join(path, name) for name in os.listdir(path)
+                                if name.lower().endswith('.wav'))
+        else:
+            self.paths = [path]
+        self.chunk_frames = chunk_frames
+        self.realtime = realtime
+        self.position = 0
+
+    def next_file(self):
+        if self.position >= len(self.paths):
+            return None
+        self.position += 1
+        return self.paths[self.position - 1]
+
+    def open_utterance(self, timeout=None):
+        path = self.next_file()
+        if path is None:
+            return None
+        wav = wave.open(path, 'rb')
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            wav.close()
+            raise ValueError(f"{path}: expected 16-bit mono PCM")
+        sample_rate = wav.getframerate()
+
+        def chunks():
+            with wav:
+                start = time.monotonic()
+                sent = 0
+                while True:
+                    data = wav.readframes(self.chunk_frames)
+                    if not data:
+                        return
+                    sent += len(data) // 2
+                    if self.realtime:
+                        time.sleep(max(0.0, start + sent / sample_rate - time.monotonic()))
+                    yield data
+        return AudioStream(sample_rate, chunks(), path)
+
+
+class GoogleBackend:
+    """Online recognition of whole phrases through recognize_google"""
+
+    name = 'google'
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, source, timeout=None, phrase_time_limit=None, on_partial=None):
+        """Final transcript of the next utterance, or None if nothing was understood"""
+        audio = source.open_utterance(timeout)
+        if audio is None:
+            print("Listening timeout - no speech detected")
+            return None
+        # Google needs the whole phrase before it can start
+        limit = None if phrase_time_limit is None else int(phrase_time_limit * audio.sample_rate) * 2
+        pcm = bytearray()
+        for chunk in audio.chunks:
+            pcm += chunk
+            if limit is not None and len(pcm) >= limit:
+                audio.chunks.close()
+                break
+        try:
+            return self.recognizer.recognize_google(sr.AudioData(bytes(pcm), audio.sample_rate, 2))
+        except sr.UnknownValueError:
+            print("Could not understand speech")
+        return None
+
+
+class VoskBackend:
+    """Offline recognition that decodes audio as it arrives.
+
+    Vosk's endpointer decides when an utterance is over, so the final
+    transcript is ready about ENDPOINT_SILENCE after speech stops, with no
+    upload or network round trip.
+    """
+
+    name = 'vosk'
+    _model = None
+    _model_lock = threading.Lock()
+
+    def __init__(self, model_dir=VOSK_MODEL_DIR):
+        self.model_dir = model_dir
+        self.model = self._load_model(model_dir)
+
+    @classmethod
+    def _load_model(cls, model_dir):
+        # One model per process; it is large and every recognizer can share it
+        if cls._model is None:
+            with cls._model_lock:
+                if cls._model is None:
+                    import vosk
+                    vosk.SetLogLevel(-1)
+                    cls._model = vosk.Model(model_dir)
+        return cls._model
+
+    def stream(self, audio):
+        """Yield (text, final) hypotheses while decoding an AudioStream"""
+        import vosk
+        recognizer = vosk.KaldiRecognizer(self.model, audio.sample_rate)
+        if hasattr(recognizer, 'SetEndpointerDelays'):
+            recognizer.SetEndpointerDelays(5.0, ENDPOINT_SILENCE, 20.0)
+        last_partial = ''
+        for chunk in audio.chunks:
+            if recognizer.AcceptWaveform(chunk):
+                text = json.loads(recognizer.Result()).get('text', '')
+                last_partial = ''
+                if text:
+                    yield text, True
+            else:
+                partial = json.loads(recognizer.PartialResult()).get('partial', '')
+                if partial and partial != last_partial:
+                    last_partial = partial
+                    yield partial, False
+        text = json.loads(recognizer.FinalResult()).get('text', '')
+        if text:
+            yield text, True
+
+    def transcribe(self, source, timeout=None, phrase_time_limit=None, on_partial=None):
+        """Final transcript of the next utterance, or None if nothing was understood
+
+        on_partial(text) is called with each new partial hypothesis.
+        """
+        audio = source.open_utterance(timeout)
+        if audio is None:
+            print("Listening timeout - no speech detected")
+            return None
+        state = {'seconds': 0.0, 'speech_at': None}
+
+        def chunks():
+            # Stop feeding audio on timeout or phrase limit; stream() then flushes
+            for chunk in audio.chunks:
+                yield chunk
+                state['seconds'] += len(chunk) / 2 / audio.sample_rate
+                if state['speech_at'] is None:
+                    if timeout is not None and state['seconds'] > timeout:
+                        return
+                elif (phrase_time_limit is not None
+                      and state['seconds'] - state['speech_at'] > phrase_time_limit):
+                    return
+
+        hypotheses = self.stream(AudioStream(audio.sample_rate, chunks(), audio.path))
+        try:
+            for text, final in hypotheses:
+                if final:
+                    return text
+                if state['speech_at'] is None:
+                    state['speech_at'] = state['seconds']
+                if on_partial is not None:
+                    on_partial(text)
+        finally:
+            hypotheses.close()
+            audio.chunks.close()
+        print("Could not understand speech" if state['speech_at'] is not None
+              else "Listening timeout - no speech detected")
+        return None
+
+
+BACKENDS = {
+    'google': GoogleBackend,
+    'vosk': VoskBackend,
+}
+
+_backends = {}
+
+
+def get_backend(name=None):
+    """The configured recognizer backend, created once per process"""
+    name = (name or ASR_BACKEND).lower()
+    if name not in _backends:
+        try:
+            _backends[name] = BACKENDS[name]()
+        except Exception as e:
+            if name == 'google':
+                raise
+            print(f"Speech backend '{name}' unavailable ({e}), using google")
+            return get_backend('google')
+    return _backends[name]
+
+
+_source = None
+_source_lock = threading.Lock()
+
+
+def default_source():
+    """WAV files from ALZIE_AUDIO_SOURCE in test mode, otherwise the microphone.
+
+    One source per process: a second MicrophoneStream would open the device
+    again and run a second capture thread.
+    """
+    global _source
+    if _source is None:
+        with _source_lock:
+            if _source is None:
+                if AUDIO_SOURCE:
+                    _source = WavFileSource(AUDIO_SOURCE)
+                else:
+                    from Microphone_Stream import MicrophoneStream
+                    _source = MicrophoneStream().start()
+    return _source
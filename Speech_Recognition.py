@@ -1,25 +1,18 @@
-import speech_recognition as sr
+from Speech_Backends import get_backend, default_source
 
-# Initialize recognizer
-recognizer = sr.Recognizer()
-
-# Function to listen to the microphone and recognize speech continuously
+# Function to listen to the microphone and recognize speech
 def recognize_speech():
-    with sr.Microphone() as source:
-        print("Adjusting for ambient noise... Please wait.")
-        recognizer.adjust_for_ambient_noise(source)  # Adjust for ambient noise levels
-        print("Listening... Speak now!")
-        
-        try:
-            while True:  # Keep listening indefinitely
-                audio = recognizer.listen(source)
-                print("Recognizing...")
-                text = recognizer.recognize_google(audio)
-                print(f"You said: {text}")
-                return text
-        
-        except sr.UnknownValueError:
-            print("Sorry, I could not understand the audio.")
+    # Recognizer backend (ALZIE_ASR_BACKEND) and the shared audio source (microphone,
+    # or WAV files from ALZIE_AUDIO_SOURCE in test mode), opened on first use
+    recognizer = get_backend()
+    source = default_source()
+    print(f"Listening with the {recognizer.name} recognizer... Speak now!")
+    text = recognizer.transcribe(source, on_partial=lambda partial: print(f"  ...{partial}", end='\r'))
+    if text:
+        print(f"You said: {text}")
+    else:
+        print("Sorry, I could not understand the audio.")
+    return text
         
 
 # Main function to start continuous speech recognition
@@ -31,5 +24,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
-
@@ -0,0 +1,203 @@
+import re
+import time
+import threading
+from Playback_Engine import get_engine, SPEECH
+
+# Configuration
+LOOKAHEAD = 2  # Chunks synthesized ahead of the one that is playing
+MAX_CHUNK_CHARS = 100  # Longer sentences are split at clause breaks
+MIN_CHUNK_WORDS = 3  # Shorter fragments are merged into a neighbour
+FIRST_CHUNK_WORDS = 6  # Keep the first chunk short; it decides time-to-first-audio
+
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+CLAUSE_BREAK = re.compile(r'(?<=[,;:])\s+')
+# A period after these ends a word, not a sentence
+ABBREVIATIONS = {'mr', 'mrs', 'ms', 'dr', 'prof', 'st', 'jr', 'sr', 'vs', 'etc', 'e.g', 'i.e', 'a.m', 'p.m'}
+
+
+def _sentences(text):
+    """Split at sentence ends, rejoining breaks that follow an abbreviation or initial"""
+    sentences = []
+    for piece in SENTENCE_BREAK.split(text.strip()):
+        if not piece:
+            continue
+        last_word = sentences[-1].rsplit(None, 1)[-1].rstrip('.').lower() if sentences else ''
+        if sentences and sentences[-1].endswith('.') and (last_word in ABBREVIATIONS or len(last_word) == 1):
+            sentences[-1] = f"{sentences[-1]} {piece}"
+        else:
+            sentences.append(piece)
+    return sentences
+
+
+def _merge_short(pieces, min_words):
+    """Join fragments shorter than min_words onto the following piece"""
+    merged = []
+    carry = ''
+    for piece in pieces:
+        piece = f"{carry} {piece}".strip() if carry else piece
+        if len(piece.split()) < min_words:
+            carry = piece
+        else:
+            merged.append(piece)
+            carry = ''
+    if carry:
+        if merged:
+            merged[-1] = f"{merged[-1]} {carry}"
+        else:
+            merged.append(carry)
+    return merged
+
+
+def _wrap_words(text, max_chars):
+    """Split text at word boundaries into pieces of at most max_chars"""
+    pieces, current = [], []
+    for word in text.split():
+        if current and len(' '.join(current + [word])) > max_chars:
+            pieces.append(' '.join(current))
+            current = []
+        current.append(word)
+    if current:
+        pieces.append(' '.join(current))
+    return pieces
+
+
+def _split_long(sentence, max_chars, min_words):
+    """Clause breaks first; any clause still over max_chars at word boundaries"""
+    pieces = []
+    for clause in _merge_short(CLAUSE_BREAK.split(sentence), min_words):
+        pieces.extend(_wrap_words(clause, max_chars) if len(clause) > max_chars else [clause])
+    return _merge_short(pieces, min_words)
+
+
+def _split_first(chunk, first_words, min_words):
+    """Cut a short lead-in off the first chunk, at a clause break if one is early enough"""
+    clauses = CLAUSE_BREAK.split(chunk, maxsplit=1)
+    if len(clauses) == 2 and min_words <= len(clauses[0].split()) <= first_words:
+        return clauses
+    words = chunk.split()
+    cut = min(first_words, len(words) - min_words)  # Leave the remainder speakable on its own
+    if cut < min_words:
+        return [chunk]
+    return [' '.join(words[:cut]), ' '.join(words[cut:])]
+
+
+def split_chunks(text, max_chars=MAX_CHUNK_CHARS, min_words=MIN_CHUNK_WORDS,
+                 first_words=FIRST_CHUNK_WORDS):
+    """Split text into sentence/clause chunks that can be synthesized independently.
+
+    The first chunk is kept to about first_words words, at a clause break when
+    there is one and at a word boundary otherwise, so the time to first audio
+    does not grow with the length of the opening sentence.
+    """
+    chunks = []
+    for sentence in _sentences(text):
+        if len(sentence) > max_chars:
+            chunks.extend(_split_long(sentence, max_chars, min_words))
+        else:
+            chunks.append(sentence)
+    chunks = _merge_short(chunks, min_words) if len(chunks) > 1 else chunks
+    if chunks and len(chunks[0].split()) > first_words:
+        chunks[:1] = _split_first(chunks[0], first_words, min_words)
+    return chunks
+
+
+class Utterance:
+    """One spoken response: its chunks, timings and completion"""
+
+    def __init__(self, text, chunks, on_done=None):
+        self.text = text
+        self.chunks = chunks
+        self.on_done = on_done
+        self.state = 'speaking'  # -> done | interrupted
+        self.first_audio = None  # Seconds from speak() until the first chunk started playing
+        self.synth_seconds = 0.0  # Time spent producing audio for all chunks
+        self.total_seconds = None  # Seconds from speak() until the last chunk finished
+        self.started = time.perf_counter()
+        self.finished = threading.Event()
+
+    def wait(self, timeout=None):
+        return self.finished.wait(timeout)
+
+    def timings(self):
+        return {
+            'chunks': len(self.chunks),
+            'first_audio_ms': None if self.first_audio is None else round(self.first_audio * 1000, 1),
+            'synth_ms': round(self.synth_seconds * 1000, 1),
+            'total_ms': None if self.total_seconds is None else round(self.total_seconds * 1000, 1),
+        }
+
+    def _finish(self, state):
+        self.state = state
+        self.finished.set()
+        if self.on_done is not None:
+            self.on_done(self)
+
+
+class StreamingSpeaker:
+    """Speak long responses chunk by chunk, synthesizing ahead of playback.
+
+    Chunk N+1 is synthesized (or fetched from the phrase cache) while chunk N
+    plays. At most `lookahead` chunks are queued ahead of the one playing, so
+    an interruption never leaves a long backlog behind it. The first audio
+    starts as soon as the first short chunk is ready, however long the reply.
+    """
+
+    def __init__(self, speech, playback=None, lookahead=LOOKAHEAD):
+        self.speech = speech
+        self.playback = playback if playback is not None else get_engine()
+        self.lookahead = lookahead
+
+    def phrases_to_prerender(self, phrases):
+        """The chunks speak() will ask for, so the phrase cache can render them early"""
+        return [chunk for phrase in phrases for chunk in split_chunks(phrase)]
+
+    def speak(self, text, priority=SPEECH, on_done=None, background=False):
+        """Start speaking text and return its Utterance.
+
+        With background=True synthesis runs on its own thread and this returns
+        at once; otherwise it returns when the last chunk has been queued.
+        """
+        utterance = Utterance(text, split_chunks(text), on_done)
+        if background:
+            threading.Thread(target=self._speak, args=(utterance, priority), daemon=True).start()
+        else:
+            self._speak(utterance, priority)
+        return utterance
+
+    def _speak(self, utterance, priority):
+        start = utterance.started
+        handles = []
+
+        def started(playback):
+            # Stamped by the engine when the first chunk is audible, not when it is queued
+            utterance.first_audio = time.perf_counter() - start
+
+        for i, chunk in enumerate(utterance.chunks):
+            if i >= self.lookahead:
+                # Bounded look-ahead: wait for an earlier chunk to finish playing first
+                oldest = handles[i - self.lookahead]
+                oldest.wait()
+                if oldest.state != 'done':
+                    break  # Interrupted, e.g. by an urgent clip; drop the rest
+            synth_start = time.perf_counter()
+            try:
+                wav = self.speech.get(chunk)
+            except Exception as e:
+                print(f"Speech synthesis error: {e}")
+                break
+            utterance.synth_seconds += time.perf_counter() - synth_start
+            handles.append(self.playback.play(wav, priority=priority, label=chunk,
+                                              on_start=started if i == 0 else None))
+
+        def finish():
+            complete = len(handles) == len(utterance.chunks)
+            for handle in handles:
+                handle.wait()
+                if handle.state != 'done':
+                    complete = False
+                    for later in handles:
+                        later.cancel()
+            utterance.total_seconds = time.perf_counter() - start
+            utterance._finish('done' if complete else 'interrupted')
+
+        threading.Thread(target=finish, daemon=True).start()
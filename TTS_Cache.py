@@ -0,0 +1,372 @@
+import os
+import json
+import time
+import queue
+import hashlib
+import itertools
+import threading
+import contextlib
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future
+
+# Configuration
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Audio_Files', 'cache')
+INDEX_FILE = 'index.json'
+LOCK_FILE = 'index.lock'  # Serializes index updates between processes
+STALE_LOCK = 10.0  # Seconds after which a lock left by a crashed process is broken
+ORPHAN_GRACE = 300.0  # Unindexed WAVs older than this are deleted at startup
+PRERENDER_SAVE_EVERY = 25  # Index writes are batched while pre-rendering
+MEMORY_ENTRIES = 128  # WAVs kept in RAM; a short phrase is ~100 KB
+DISK_ENTRIES = 5000  # Oldest renders are deleted beyond this
+INTERACTIVE, PRERENDER = 0, 1  # Synthesis priorities; a live reply jumps the prerender queue
+
+VoiceSettings = namedtuple('VoiceSettings', 'voice rate volume pitch')
+
+
+def choose_voice(voices, preferred=()):
+    """Id of the first preferred voice installed, else the first 'female' one, else None"""
+    for voice in voices:
+        if any(name in voice.name for name in preferred):
+            return voice.id
+    for voice in voices:
+        if 'female' in voice.name.lower():
+            return voice.id
+    return None
+
+
+def cache_key(text, settings):
+    raw = '\0'.join([text, str(settings.voice), str(settings.rate), str(settings.volume)]
+                    + ([str(settings.pitch)] if settings.pitch is not None else []))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class SpeechSynthesizer:
+    """One pyttsx3 engine owned by a worker thread, rendering text to WAV files.
+
+    pyttsx3 engines are not thread-safe and slow to create (init scans every
+    installed voice), and pyttsx3.init() hands out one cached engine per
+    driver anyway. So a process has a single synthesizer (see
+    get_synthesizer()) and every speaker's requests go through its priority
+    queue. Each job carries its own VoiceSettings, which the worker applies
+    before rendering, so speakers with different voices or rates never
+    overwrite each other. submit() returns a Future that resolves to the
+    seconds spent synthesizing (0 if the file already existed).
+    """
+
+    def __init__(self):
+        self.queue = queue.PriorityQueue()
+        self.order = itertools.count()  # FIFO within one priority
+        self.ready = threading.Event()
+        self.error = None
+        self.voices = []
+        self.default_voice = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def voice_settings(self, rate=150, volume=1.0, preferred_voices=(), pitch=None):
+        """Resolved VoiceSettings for a speaker, once the engine is up"""
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+        voice = choose_voice(self.voices, preferred_voices) or self.default_voice
+        return VoiceSettings(voice, rate, volume, pitch)
+
+    def submit(self, text, path, settings, priority=INTERACTIVE):
+        future = Future()
+        self.queue.put((priority, next(self.order), text, path, settings, future))
+        return future
+
+    def _apply(self, engine, settings):
+        if settings.voice is not None:
+            engine.setProperty('voice', settings.voice)
+        engine.setProperty('rate', settings.rate)
+        engine.setProperty('volume', settings.volume)
+        if settings.pitch is not None:
+            try:
+                engine.setProperty('pitch', settings.pitch)
+            except Exception:
+                pass  # Most drivers have no pitch control
+
+    def _run(self):
+        try:
+            import pyttsx3
+            engine = pyttsx3.init()
+            self.voices = engine.getProperty('voices')
+            self.default_voice = engine.getProperty('voice')
+        except Exception as e:
+            print(f"Speech synthesis unavailable: {e}")
+            self.error = e
+            self.ready.set()
+            return
+        self.ready.set()
+
+        applied = None
+        while True:
+            _, _, text, path, settings, future = self.queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if os.path.exists(path):
+                    future.set_result(0.0)
+                    continue
+                if settings != applied:
+                    self._apply(engine, settings)
+                    applied = settings
+                start = time.perf_counter()
+                tmp_path = path + '.tmp.wav'
+                engine.save_to_file(text, tmp_path)
+                engine.runAndWait()
+                os.replace(tmp_path, path)
+                future.set_result(time.perf_counter() - start)
+            except Exception as e:
+                future.set_exception(e)
+
+
+class PhraseCache:
+    """Synthesized speech keyed by (text, voice, rate, volume).
+
+    Two tiers: an LRU of WAV bytes in memory and WAV files on disk, which
+    survive restarts. The disk index remembers how long each phrase took to
+    synthesize, so a hit can report the time it saved. Use get_cache() so one
+    process shares a single instance per directory; saves merge with the index
+    on disk under a lock file, so other processes' entries are kept too.
+    """
+
+    def __init__(self, directory=CACHE_DIR, memory_entries=MEMORY_ENTRIES, disk_entries=DISK_ENTRIES):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.memory = OrderedDict()  # key -> WAV bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.index = self._load_index()  # key -> {'text', 'seconds'}, oldest first
+        self.recorded = OrderedDict()  # Keys recorded since the last save
+        self.memory_hits = self.disk_hits = self.misses = 0
+        self.synth_seconds = self.saved_seconds = 0.0
+        self._remove_orphans()
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), encoding='utf-8') as f:
+                return OrderedDict(json.load(f))
+        except (OSError, ValueError):
+            return OrderedDict()
+
+    def _load_index(self):
+        return OrderedDict((key, entry) for key, entry in self._read_index().items()
+                           if os.path.exists(self.path(key)))
+
+    @contextlib.contextmanager
+    def _index_lock(self):
+        path = os.path.join(self.directory, LOCK_FILE)
+        while True:
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(path) > STALE_LOCK:
+                        os.remove(path)
+                        continue
+                except OSError:
+                    continue
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            os.close(fd)
+            os.remove(path)
+
+    def _remove_orphans(self):
+        """Delete WAVs no index entry points at, e.g. left by an older version"""
+        now = time.time()
+        with self._index_lock():
+            indexed = set(self._read_index())
+            for name in os.listdir(self.directory):
+                key, ext = os.path.splitext(name)
+                if ext != '.wav' or key in indexed:
+                    continue
+                try:
+                    if now - os.path.getmtime(os.path.join(self.directory, name)) > ORPHAN_GRACE:
+                        os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def save(self):
+        """Merge the entries recorded since the last save into the on-disk index"""
+        with self.lock:
+            if not self.recorded:
+                return
+            with self._index_lock():
+                index = self._read_index()
+                for key, entry in self.recorded.items():
+                    index.pop(key, None)
+                    index[key] = entry
+                while len(index) > self.disk_entries:
+                    old_key, _ = index.popitem(last=False)
+                    self.memory.pop(old_key, None)
+                    try:
+                        os.remove(self.path(old_key))
+                    except OSError:
+                        pass
+                path = os.path.join(self.directory, INDEX_FILE)
+                with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                    json.dump(index, f)
+                os.replace(path + '.tmp', path)
+            self.index = index
+            self.recorded.clear()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.wav")
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.memory or key in self.index
+
+    def get(self, key):
+        """WAV bytes for key, or None; counts a hit or miss"""
+        with self.lock:
+            data = self.memory.get(key)
+            if data is not None:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                self.saved_seconds += self.index.get(key, {}).get('seconds', 0.0)
+                return data
+            entry = self.index.get(key)
+        if entry is not None:
+            try:
+                with open(self.path(key), 'rb') as f:
+                    data = f.read()
+            except OSError:
+                data = None
+        with self.lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self.saved_seconds += entry.get('seconds', 0.0)
+            self._remember(key, data)
+            return data
+
+    def _remember(self, key, data):
+        self.memory[key] = data
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def record(self, key, text, seconds, data=None, save=True):
+        """Register a freshly synthesized file, optionally keeping it in memory
+
+        With save=False the index is only written by a later save(), so a
+        batch of records costs one index write.
+        """
+        with self.lock:
+            self.synth_seconds += seconds
+            if key not in self.index or seconds:
+                self.index[key] = {'text': text, 'seconds': seconds}
+            self.index.move_to_end(key)
+            self.recorded[key] = self.index[key]
+            if data is not None:
+                self._remember(key, data)
+        if save:
+            self.save()
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            'synth_seconds': round(self.synth_seconds, 3),
+            'saved_seconds': round(self.saved_seconds, 3),
+            'disk_entries': len(self.index),
+        }
+
+
+class CachedSpeech:
+    """Speech for a text in one voice: from the phrase cache, else synthesized and cached"""
+
+    def __init__(self, rate=150, volume=1.0, preferred_voices=(), pitch=None,
+                 synthesizer=None, cache=None):
+        self.synthesizer = synthesizer if synthesizer is not None else get_synthesizer()
+        self.cache = cache if cache is not None else get_cache()
+        self.voice = dict(rate=rate, volume=volume, preferred_voices=preferred_voices, pitch=pitch)
+        self._settings = None
+
+    def settings(self):
+        """This speaker's VoiceSettings, resolved against the installed voices once"""
+        if self._settings is None:
+            self._settings = self.synthesizer.voice_settings(**self.voice)
+        return self._settings
+
+    def key(self, text):
+        return cache_key(text, self.settings())
+
+    def get(self, text):
+        """WAV bytes of text, synthesizing at interactive priority on a miss"""
+        key = self.key(text)
+        data = self.cache.get(key)
+        if data is None:
+            path = self.cache.path(key)
+            seconds = self.synthesizer.submit(text, path, self.settings(), INTERACTIVE).result()
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.cache.record(key, text, seconds, data)
+        return data
+
+    def path(self, text):
+        """Path of the cached WAV file for text, synthesizing it on a miss"""
+        self.get(text)
+        return self.cache.path(self.key(text))
+
+    def prerender(self, phrases):
+        """Queue phrases that are not cached yet behind any live request"""
+        def queue_all():
+            pending = []
+            for text in dict.fromkeys(phrases):
+                key = self.key(text)
+                if key not in self.cache:
+                    future = self.synthesizer.submit(text, self.cache.path(key), self.settings(), PRERENDER)
+                    pending.append((key, text, future))
+            if pending:
+                print(f"Pre-rendering {len(pending)} phrases in the background")
+            # Renders finish in queue order; the index is written every few phrases
+            for done, (key, text, future) in enumerate(pending, 1):
+                try:
+                    self.cache.record(key, text, future.result(), save=done % PRERENDER_SAVE_EVERY == 0)
+                except Exception as e:
+                    print(f"Pre-rendering failed for {text!r}: {e}")
+            self.cache.save()
+        # voice_settings() waits for the engine, so don't block the caller on it
+        threading.Thread(target=queue_all, daemon=True).start()
+
+    def stats(self):
+        return self.cache.stats()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+_synthesizer = None
+_synthesizer_lock = threading.Lock()
+
+
+def get_synthesizer():
+    """The process-wide speech synthesizer, started on first use"""
+    global _synthesizer
+    if _synthesizer is None:
+        with _synthesizer_lock:
+            if _synthesizer is None:
+                _synthesizer = SpeechSynthesizer()
+    return _synthesizer
+
+
+def get_cache(directory=CACHE_DIR):
+    """The shared phrase cache for a directory, created on first use"""
+    directory = os.path.abspath(directory)
+    with _caches_lock:
+        if directory not in _caches:
+            _caches[directory] = PhraseCache(directory)
+        return _caches[directory]
@@ -1,114 +1,57 @@
-import pyttsx3
 import os
-import subprocess
-import time
+import shutil
+from TTS_Cache import CachedSpeech
+from Playback_Engine import get_engine, play_files
+from Streaming_TTS import StreamingSpeaker
+
+# Calming female voices, in order of preference
+PREFERRED_VOICES = [
+    'Microsoft Zira Desktop',
+    'Microsoft Hazel Desktop',
+    'VW Julie',
+    'VW Kate'
+]
 
 class AudioGenerator:
     def __init__(self):
         self.audio_dir = os.path.join(os.path.dirname(__file__), 'Audio_Files')
         self.ensure_directory_exists()
+        # The process-wide synthesizer renders in this voice; renders are cached by text and voice
+        self.speech = CachedSpeech(rate=140, volume=0.8, pitch=0.9, preferred_voices=PREFERRED_VOICES)
         
     def ensure_directory_exists(self):
         if not os.path.exists(self.audio_dir):
             os.makedirs(self.audio_dir)
     
     def generate_soothing_voice(self, text, filename):
-        engine = pyttsx3.init()
-        
-        # Configure voice settings
-        self.configure_voice(engine)
-        
-        # Save to file
+        # The player deletes what it plays, so hand it a copy of the cached render
         full_path = os.path.join(self.audio_dir, f'{filename}.wav')
-        engine.save_to_file(text, full_path)
-        engine.runAndWait()
+        shutil.copyfile(self.speech.path(text), full_path)
         
         print(f"Generated: {full_path}")
         return full_path
-    
-    def configure_voice(self, engine):
-        voices = engine.getProperty('voices')
-        preferred_voices = [
-            'Microsoft Zira Desktop',
-            'Microsoft Hazel Desktop',
-            'VW Julie',
-            'VW Kate'
-        ]
-        
-        for voice in voices:
-            if any(pref in voice.name for pref in preferred_voices):
-                engine.setProperty('voice', voice.id)
-                print(f"Using voice: {voice.name}")
-                break
-        else:
-            for voice in voices:
-                if 'female' in voice.name.lower():
-                    engine.setProperty('voice', voice.id)
-                    print(f"Using fallback voice: {voice.name}")
-                    break
-        
-        engine.setProperty('rate', 140)
-        engine.setProperty('volume', 0.8)
-        engine.setProperty('pitch', 0.9)
 
 
 class AudioSystem(AudioGenerator):
     def __init__(self):
         super().__init__()
-        self.audio_player_path = os.path.join(self.audio_dir, 'Audio_Player.py')
-    
-    def create_audio_player_script(self):
-        audio_player_code = """import os
-import time
-import pygame
-from pygame import mixer
-
-def play_and_delete_audio_files():
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=4096)
-    audio_files = [f for f in os.listdir(current_dir) if f.lower().endswith('.wav')]
-    audio_files.sort()
+        self.playback = get_engine()
+        self.speaker = StreamingSpeaker(self.speech, self.playback)
     
-    if not audio_files:
-        print("No audio files found in:", current_dir)
-        return
-    
-    for audio_file in audio_files:
-        file_path = os.path.join(current_dir, audio_file)
-        try:
-            print(f"Loading: {audio_file}")
-            sound = mixer.Sound(file_path)
-            channel = sound.play()
-            os.remove(file_path)
-            print(f"Deleted: {audio_file}")
-            while channel.get_busy():
-                time.sleep(0.1)
-        except Exception as e:
-            print(f"Error processing {audio_file}: {str(e)}")
-    
-    print("All audio files processed.")
-    pygame.mixer.quit()
-
-if __name__ == "__main__":
-    play_and_delete_audio_files()
-    input("Press Enter to exit...")
-"""
-        with open(self.audio_player_path, 'w') as f:
-            f.write(audio_player_code)
-        print(f"Created audio player script at: {self.audio_player_path}")
+    def speak(self, text, on_done=None):
+        """Speak text chunk by chunk in-process; returns the Streaming_TTS.Utterance"""
+        return self.speaker.speak(text, on_done=on_done, background=True)
     
     def run_audio_player(self):
-        if not os.path.exists(self.audio_player_path):
-            self.create_audio_player_script()
-        
-        # Wait a moment to ensure files are written
-        time.sleep(1)
-        
-        # Run the audio player script
-        subprocess.Popen(['python', self.audio_player_path], 
-                         cwd=self.audio_dir,
-                         creationflags=subprocess.CREATE_NEW_CONSOLE)
-        print("Audio player started in a new console window.")
+        """Play the WAV files waiting in Audio_Files, oldest first, deleting each once played"""
+        audio_files = sorted(
+            (os.path.join(self.audio_dir, f) for f in os.listdir(self.audio_dir)
+             if f.lower().endswith('.wav')),
+            key=os.path.getctime)
+        if not audio_files:
+            print("No audio files found in:", self.audio_dir)
+            return None
+        return play_files(audio_files, delete_after=True, engine=self.playback)
 
 
 if __name__ == "__main__":
@@ -124,8 +67,7 @@ if __name__ == "__main__":
     
 
     def inp_text_to_speech(text):
-        filename = "text_to_speech_audio"
-        audio_system.generate_soothing_voice(text, filename)
-
-        audio_system.run_audio_player()
+        utterance = audio_system.speak(text)
+        utterance.wait()
+        print(f"Speech timings: {utterance.timings()}")
 
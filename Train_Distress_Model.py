@@ -0,0 +1,94 @@
+import json
+import time
+import hashlib
+import argparse
+from Training_Data import ensure_cache, batch_generator, split_batches
+from Distress_Model import MODEL_FILE, export_keras_weights, load_model, read_metadata, reset_model
+
+# Configuration
+EPOCHS = 50
+BATCH_SIZE = 4
+HIDDEN_LAYERS = (8, 4)
+OPTIMIZER = 'adam'
+LOSS = 'mean_squared_error'
+
+
+def data_hash(manifest, epochs=EPOCHS):
+    """Fingerprint of the training data and settings; a change triggers retraining
+
+    epochs is the value training actually runs with, so a --epochs model is
+    not mistaken for a default one (or the other way round).
+    """
+    digest = hashlib.sha1(manifest['source_hash'].encode())
+    settings = [epochs, BATCH_SIZE, list(HIDDEN_LAYERS), OPTIMIZER, LOSS, manifest['features']]
+    digest.update(json.dumps(settings).encode())
+    return digest.hexdigest()
+
+
+def train(manifest, epochs=EPOCHS, path=MODEL_FILE):
+    """Train the distress network on the cached data and write the artifact to path"""
+    # TensorFlow is only needed here, never in the runtime process
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense, Input
+
+    # Batches stream from the columnar cache, already standardized with its stats
+    model = Sequential(
+        [Input(shape=(len(manifest['features']),))]
+        + [Dense(units, activation='relu') for units in HIDDEN_LAYERS]
+        + [Dense(1, activation='linear')]  # Output layer (for percentage prediction)
+    )
+    model.compile(optimizer=OPTIMIZER, loss=LOSS, metrics=['mae'])
+    model.summary()
+
+    # One step per batch iter_batches yields, so every epoch sees each row exactly once
+    train_steps = split_batches(manifest, 'train', BATCH_SIZE)
+    validation_steps = split_batches(manifest, 'validation', BATCH_SIZE)
+    model.fit(batch_generator(manifest, 'train', BATCH_SIZE), steps_per_epoch=train_steps,
+              epochs=epochs,
+              validation_data=batch_generator(manifest, 'validation', BATCH_SIZE),
+              validation_steps=validation_steps)
+
+    test_loss, test_mae = model.evaluate(batch_generator(manifest, 'validation', BATCH_SIZE),
+                                         steps=validation_steps)
+    print(f"Test Loss: {test_loss}, Test MAE: {test_mae}")
+
+    export_keras_weights(model, path, mean=manifest['mean'], std=manifest['std'],
+                         data_hash=data_hash(manifest, epochs))
+    reset_model()
+
+
+def ensure_model(path=MODEL_FILE, force=False, epochs=EPOCHS):
+    """Load the distress model artifact, retraining only if the training data changed"""
+    manifest = ensure_cache()
+    current_hash = data_hash(manifest, epochs)
+    metadata = read_metadata(path)
+
+    if force or metadata is None or metadata['data_hash'] != current_hash:
+        reason = "forced" if force else "missing or outdated" if metadata is None else "training data changed"
+        print(f"Training distress model ({reason})...")
+        train(manifest, epochs=epochs, path=path)
+
+    start = time.perf_counter()
+    model = load_model(path)
+    print(f"Loaded distress model in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return model
+
+
+def main(force=False, epochs=EPOCHS):
+    manifest = ensure_cache()
+    current_hash = data_hash(manifest, epochs)
+    metadata = read_metadata()
+    if not force and metadata is not None and metadata['data_hash'] == current_hash:
+        print(f"{MODEL_FILE} is up to date (data hash {current_hash[:12]}); use --force to retrain")
+        return
+    train(manifest, epochs=epochs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the distress model artifact")
+    parser.add_argument('--force', action='store_true',
+                        help="Retrain even if the training data is unchanged")
+    parser.add_argument('--epochs', type=int, default=EPOCHS,
+                        help="Training epochs")
+    args = parser.parse_args()
+    main(force=args.force, epochs=args.epochs)
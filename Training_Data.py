@@ -0,0 +1,250 @@
+import os
+import re
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from Lexicon import get_lexicon, tokenize, TOKEN_PATTERN
+
+# Configuration
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCES = (os.path.join(BASE_DIR, 'Alzie_database.csv'),
+           os.path.join(BASE_DIR, 'patient_interactions.csv'))
+CACHE_DIR = os.path.join(BASE_DIR, 'Models', 'training_data')
+MANIFEST_FILE = 'manifest.json'
+CACHE_VERSION = 3
+CHUNK_SIZE = 100_000  # CSV rows read and cached per part file
+VALIDATION_EVERY = 5  # Every 5th row is held out for validation
+
+COLUMNS = ('heart_rate', 'blood_pressure', 'polarity', 'word_choice', 'context', 'target')
+FEATURE_COLUMNS = ('heart_rate', 'blood_pressure', 'polarity', 'word_choice', 'context')  # Model input order
+TARGET_COLUMN = 'target'
+
+# Alzie_database.csv records no blood pressure. Its 'panic pitch' column fills that
+# input, as in the original hand-entered training rows, so the CSV is still usable.
+VITALS_COLUMNS = {
+    'heart_rate': 'panic heart rate',
+    'blood_pressure': 'panic pitch',
+    'polarity': 'sentiment',
+    'target': 'Value',
+}
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the SHA-1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_hash(sources=SOURCES):
+    """Fingerprint of every source CSV, in order"""
+    digest = hashlib.sha1(str(CACHE_VERSION).encode())
+    for path in sources:
+        digest.update(os.path.basename(path).encode())
+        digest.update(file_digest(path).encode())
+    return digest.hexdigest()
+
+
+def polarities(texts):
+    """Sentiment polarity of each text, through the batched spaCy pipeline"""
+    from Sentiment_analysis import analyze_texts
+    return np.fromiter((result['polarity'] for result in analyze_texts(texts.tolist())),
+                       dtype=np.float32, count=len(texts))
+
+
+def word_choice_scores(texts):
+    """Vectorized calculate_word_choice_score: 'distress' lexicon hits per word token"""
+    tokens = texts.str.lower().str.replace('’', "'", regex=False).str.findall(TOKEN_PATTERN)
+    joined = tokens.str.join(' ')
+    hits = pd.Series(0, index=texts.index)
+    for phrase in get_lexicon().phrases.get('distress', ()):
+        # Whole-word token sequences, as the lexicon trie matches them
+        hits += joined.str.count(r'(?<!\S)' + re.escape(' '.join(tokenize(phrase))) + r'(?!\S)')
+    counts = tokens.str.len()
+    return (hits / counts.where(counts > 0)).fillna(0.0).to_numpy(np.float32)
+
+
+def context_scores(texts):
+    """Vectorized calculate_context_score over a Series of texts"""
+    score = (0.3 * texts.str.contains('!', regex=False)
+             + 0.2 * texts.str.contains('?', regex=False)
+             + 0.1 * (texts.str.split().str.len() > 10))
+    return score.clip(upper=1.0).to_numpy(np.float32)
+
+
+def _from_vitals(chunk):
+    """Alzie_database.csv: vitals during an episode and the labelled panic value"""
+    columns = {name: chunk[source].to_numpy(np.float32) for name, source in VITALS_COLUMNS.items()}
+    # 'sentiment' is scored 0..1; polarity elsewhere is TextBlob's -1..1
+    columns['polarity'] = 2.0 * columns['polarity'] - 1.0
+    # No transcript was recorded: no distress words and neutral punctuation
+    columns['word_choice'] = np.zeros(len(chunk), dtype=np.float32)
+    columns['context'] = np.zeros(len(chunk), dtype=np.float32)
+    return columns
+
+
+def _from_interactions(chunk):
+    """patient_interactions.csv: transcribed utterances with vitals and labels"""
+    texts = chunk['text'].fillna('').astype(str)
+    distressed = chunk[['anxiety_label', 'pain_label']].max(axis=1)
+    target = distressed * (1 - chunk['false_positive_label'])
+    return {
+        'heart_rate': chunk['heart_rate'].to_numpy(np.float32),
+        'blood_pressure': chunk['blood_pressure'].to_numpy(np.float32),
+        'polarity': polarities(texts),
+        'word_choice': word_choice_scores(texts),
+        'context': context_scores(texts),
+        'target': target.to_numpy(np.float32),
+    }
+
+
+READERS = {
+    'Alzie_database.csv': _from_vitals,
+    'patient_interactions.csv': _from_interactions,
+}
+
+
+def read_manifest(cache_dir=CACHE_DIR):
+    path = os.path.join(cache_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get('cache_version') != CACHE_VERSION:
+        return None
+    manifest['directory'] = cache_dir
+    return manifest
+
+
+def build_cache(sources=SOURCES, cache_dir=CACHE_DIR, chunk_size=CHUNK_SIZE):
+    """Stream the source CSVs into columnar part files and return the manifest.
+
+    Only one chunk is in memory at a time. Normalization stats for the
+    training rows are accumulated as running sums along the way, so they never
+    need a second pass over the data. Part files are version-suffixed and the
+    manifest is replaced last, so readers never see a mix of two builds.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    previous = read_manifest(cache_dir)
+    version = str(time.time_ns())
+    parts = []
+    rows = 0
+    n_features = len(FEATURE_COLUMNS)
+    count, total, total_sq = 0, np.zeros(n_features), np.zeros(n_features)
+
+    for path in sources:
+        reader = READERS[os.path.basename(path)]
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            columns = reader(chunk)
+            name = f"part-{version}-{len(parts):05d}.npz"
+            np.savez(os.path.join(cache_dir, name), **columns)
+            parts.append({'file': name, 'rows': len(chunk), 'offset': rows})
+
+            train = _split_mask(rows, len(chunk), 'train')
+            features = np.column_stack([columns[c] for c in FEATURE_COLUMNS])[train].astype(np.float64)
+            count += len(features)
+            total += features.sum(axis=0)
+            total_sq += (features ** 2).sum(axis=0)
+            rows += len(chunk)
+            print(f"Cached {rows} rows from {os.path.basename(path)}")
+
+    mean = total / max(count, 1)
+    std = np.sqrt(np.maximum(total_sq / max(count, 1) - mean ** 2, 0))
+    std[std == 0] = 1.0
+
+    manifest = {
+        'cache_version': CACHE_VERSION,
+        'version': version,
+        'source_hash': source_hash(sources),
+        'rows': rows,
+        'train_rows': count,
+        'features': list(FEATURE_COLUMNS),
+        'vitals_columns': VITALS_COLUMNS,
+        'mean': mean.tolist(),
+        'std': std.tolist(),
+        'parts': parts,
+    }
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    # Keep the previous build for readers that are still iterating over it
+    keep = {part['file'] for part in parts + (previous or {}).get('parts', [])}
+    for name in os.listdir(cache_dir):
+        if name.endswith('.npz') and name not in keep:
+            os.remove(os.path.join(cache_dir, name))
+    manifest['directory'] = cache_dir
+    return manifest
+
+
+def ensure_cache(sources=SOURCES, cache_dir=CACHE_DIR, force=False):
+    """The cached training data, rebuilt only when a source CSV changed"""
+    manifest = read_manifest(cache_dir)
+    if force or manifest is None or manifest['source_hash'] != source_hash(sources):
+        manifest = build_cache(sources, cache_dir)
+    return manifest
+
+
+def _split_mask(offset, rows, split):
+    """Rows of a part in the given split, chosen by global row position"""
+    held_out = (np.arange(offset, offset + rows) % VALIDATION_EVERY) == 0
+    return ~held_out if split == 'train' else held_out
+
+
+def split_rows(manifest, split):
+    return manifest['train_rows'] if split == 'train' else manifest['rows'] - manifest['train_rows']
+
+
+def split_batches(manifest, split, batch_size):
+    """Batches in one pass of iter_batches; each part file ends with its own partial batch"""
+    return sum(-(-int(_split_mask(part['offset'], part['rows'], split).sum()) // batch_size)
+               for part in manifest['parts'])
+
+
+def iter_batches(manifest, split='train', batch_size=32, normalize=True, shuffle=True, seed=0):
+    """Yield (X, y) batches of one split, reading one part file at a time"""
+    rng = np.random.default_rng(seed)
+    mean = np.asarray(manifest['mean'], dtype=np.float32)
+    std = np.asarray(manifest['std'], dtype=np.float32)
+    order = rng.permutation(len(manifest['parts'])) if shuffle else range(len(manifest['parts']))
+
+    for i in order:
+        part = manifest['parts'][i]
+        with np.load(os.path.join(manifest['directory'], part['file'])) as data:
+            mask = _split_mask(part['offset'], part['rows'], split)
+            X = np.column_stack([data[c] for c in manifest['features']])[mask]
+            y = data[TARGET_COLUMN][mask]
+        if normalize:
+            X = (X - mean) / std
+        rows = rng.permutation(len(X)) if shuffle else np.arange(len(X))
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            yield X[batch], y[batch]
+
+
+def batch_generator(manifest, split='train', batch_size=32, seed=0):
+    """Endless shuffled batches for Keras fit(), reshuffled every epoch"""
+    epoch = 0
+    while True:
+        yield from iter_batches(manifest, split, batch_size, seed=seed + epoch)
+        epoch += 1
+
+
+def main(force=False):
+    manifest = ensure_cache(force=force)
+    print(f"{manifest['rows']} rows ({manifest['train_rows']} train) "
+          f"in {len(manifest['parts'])} parts under {CACHE_DIR}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cache the distress model training data")
+    parser.add_argument('--force', action='store_true',
+                        help="Rebuild the cache even if the CSVs are unchanged")
+    args = parser.parse_args()
+    main(force=args.force)
@@ -0,0 +1,83 @@
+import time
+import threading
+from collections import OrderedDict
+
+# Configuration
+MAX_ENTRIES = 1024
+TTL_SECONDS = 6 * 3600  # Entries older than this are recomputed
+
+_caches = {}  # name -> UtteranceCache, for cache_stats()
+
+
+def normalize(text):
+    """Cache key for an utterance: lowercase with collapsed whitespace"""
+    return ' '.join(text.lower().split())
+
+
+class UtteranceCache:
+    """Bounded LRU cache with a TTL for results derived purely from utterance text.
+
+    Only pure results belong here (sentiment, lexicon hits); anything that
+    updates state, like MoodAnalyzer's stress level, must run on every call.
+    """
+
+    def __init__(self, name, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (stored_at, value)
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        _caches[name] = self
+
+    def get(self, text):
+        """Cached value for text, or None on a miss"""
+        key = normalize(text)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if self.ttl is None or time.monotonic() - entry[0] < self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self.entries[key]
+                self.expirations += 1
+            self.misses += 1
+        return None
+
+    def put(self, text, value):
+        key = normalize(text)
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, text, compute):
+        """Return the cached value for text, calling compute(text) on a miss"""
+        value = self.get(text)
+        if value is None:
+            value = compute(text)
+            self.put(text, value)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def cache_stats():
+    """Counters for every utterance cache, keyed by cache name"""
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,225 @@
+import time
+import argparse
+import numpy as np
+
+# Configuration
+WINDOW = 60  # Samples kept per patient (one minute at 1 Hz)
+INITIAL_PATIENTS = 64  # Preallocated slots; doubled when a ward outgrows them
+CHANNELS = ('heart_rate', 'blood_pressure')
+HEART_RATE, BLOOD_PRESSURE = range(len(CHANNELS))
+
+# Feature vector layout. The first MODEL_INPUTS columns are exactly the distress
+# model's input (heart rate, blood pressure, then the latest utterance's polarity,
+# word choice and context scores), so the model reads a view.
+FEATURES = ('hr_mean', 'bp_mean', 'polarity', 'word_choice', 'context',
+            'hr_slope', 'bp_slope', 'hr_var', 'bp_var', 'hr_last', 'bp_last')
+MODEL_INPUTS = 5
+TEXT_SCORES = slice(FEATURES.index('polarity'), FEATURES.index('context') + 1)
+MEANS, SLOPES, VARIANCES, LAST = (slice(FEATURES.index(name), FEATURES.index(name) + 2)
+                                  for name in ('hr_mean', 'hr_slope', 'hr_var', 'hr_last'))
+
+
+class VitalsMonitor:
+    """Sliding-window vital-sign features for many patients in shared arrays.
+
+    Every patient owns one row of preallocated ring buffers. Running sums of
+    x, x**2 and t*x make each sample O(1): mean, variance and least-squares
+    slope come from the sums, not from rescanning the window. The sums are
+    recomputed exactly each time a buffer wraps (O(WINDOW) every WINDOW
+    samples), which keeps float drift and the t*x magnitudes bounded.
+    """
+
+    def __init__(self, window=WINDOW, capacity=INITIAL_PATIENTS):
+        self.window = window
+        self.slots = {}  # patient_id -> row
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old = getattr(self, 'values', None)
+        n_channels = len(CHANNELS)
+        arrays = {
+            'values': np.zeros((capacity, self.window, n_channels), dtype=np.float32),
+            'times': np.zeros((capacity, self.window)),
+            'count': np.zeros(capacity, dtype=np.int64),
+            'origin': np.zeros(capacity, dtype=np.int64),  # Sample number of t = 0
+            'sums': np.zeros((capacity, n_channels)),
+            'sq_sums': np.zeros((capacity, n_channels)),
+            't_sums': np.zeros((capacity, n_channels)),
+            'features': np.zeros((capacity, len(FEATURES)), dtype=np.float32),
+        }
+        for name, array in arrays.items():
+            if old is not None:
+                previous = getattr(self, name)
+                array[:len(previous)] = previous
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def __len__(self):
+        return len(self.slots)
+
+    def slot(self, patient_id):
+        """Row of patient_id, allocating one on first sight"""
+        slot = self.slots.get(patient_id)
+        if slot is None:
+            slot = len(self.slots)
+            if slot == self.capacity:
+                self._allocate(self.capacity * 2)
+            self.slots[patient_id] = slot
+        return slot
+
+    def add(self, patient_id, timestamp, heart_rate, blood_pressure):
+        """Ingest one reading for one patient"""
+        slot = self.slot(patient_id)
+        self.add_batch(np.array([slot]), np.array([timestamp]),
+                       np.array([[heart_rate, blood_pressure]], dtype=np.float32))
+
+    def add_batch(self, slots, timestamps, readings):
+        """Ingest one reading for each of several distinct patient slots at once"""
+        W = self.window
+        count = self.count[slots]
+        pos = count % W
+        full = count >= W
+
+        old = self.values[slots, pos].astype(np.float64)
+        old[~full] = 0.0
+        new = readings.astype(np.float64)
+        t_new = (count - self.origin[slots]).astype(np.float64)[:, None]
+
+        self.sums[slots] += new - old
+        self.sq_sums[slots] += new * new - old * old
+        self.t_sums[slots] += t_new * new - (t_new - W) * old
+
+        self.values[slots, pos] = readings
+        self.times[slots, pos] = timestamps
+        self.count[slots] = count + 1
+
+        wrapped = slots[pos == W - 1]
+        if len(wrapped):
+            self._resync(wrapped)
+        self._update_features(slots)
+
+    def _resync(self, slots):
+        """Exact sums for buffers that just wrapped, with t restarting at 0"""
+        # After a wrap the buffer is in chronological order again
+        values = self.values[slots].astype(np.float64)
+        t = np.arange(self.window, dtype=np.float64)[None, :, None]
+        self.origin[slots] = self.count[slots] - self.window
+        self.sums[slots] = values.sum(axis=1)
+        self.sq_sums[slots] = (values * values).sum(axis=1)
+        self.t_sums[slots] = (t * values).sum(axis=1)
+
+    def _update_features(self, slots):
+        W = self.window
+        count = self.count[slots]
+        k = np.minimum(count, W).astype(np.float64)
+        sums, sq_sums, t_sums = self.sums[slots], self.sq_sums[slots], self.t_sums[slots]
+
+        mean = sums / k[:, None]
+        var = np.maximum(sq_sums / k[:, None] - mean * mean, 0.0)
+
+        # Least-squares slope per sample over t = first..last, then per second
+        first = (count - k - self.origin[slots]).astype(np.float64)
+        t_mean = first + (k - 1) / 2
+        t_spread = k * (k * k - 1) / 12
+        enough = k >= 2
+        slope = np.zeros_like(sums)
+        slope[enough] = ((t_sums[enough] - t_mean[enough, None] * sums[enough])
+                         / t_spread[enough, None])
+
+        latest = self.times[slots, (count - 1) % W]
+        earliest = self.times[slots, (count - k.astype(np.int64)) % W]
+        interval = np.where(enough, (latest - earliest) / np.maximum(k - 1, 1), 0.0)
+        slope = np.divide(slope, interval[:, None], out=np.zeros_like(slope),
+                          where=interval[:, None] > 0)
+
+        features = self.features
+        features[slots, MEANS] = mean
+        features[slots, SLOPES] = slope
+        features[slots, VARIANCES] = var
+        features[slots, LAST] = self.values[slots, (count - 1) % W]
+
+    def has_readings(self, patient_id):
+        slot = self.slots.get(patient_id)
+        return slot is not None and self.count[slot] > 0
+
+    def set_text_scores(self, patient_id, polarity, word_choice, context):
+        """Scores of the patient's latest utterance; they stay until the next one"""
+        self.features[self.slot(patient_id), TEXT_SCORES] = (polarity, word_choice, context)
+
+    def latest(self, patient_id):
+        """Full feature vector of a patient (a view, updated in place)"""
+        return self.features[self.slots[patient_id]]
+
+    def model_input(self, patient_id):
+        """(1, MODEL_INPUTS) view of a patient's features in distress model input order"""
+        slot = self.slots[patient_id]
+        return self.features[slot:slot + 1, :MODEL_INPUTS]
+
+    def model_inputs(self):
+        """(patients, MODEL_INPUTS) view of every patient's model input, in slot order"""
+        return self.features[:len(self.slots), :MODEL_INPUTS]
+
+
+class SimulatedSensorFeed:
+    """Local stand-in for bedside monitors: drifting vitals with panic episodes"""
+
+    def __init__(self, patient_ids, seed=0, episode_rate=0.002):
+        self.patient_ids = list(patient_ids)
+        self.rng = np.random.default_rng(seed)
+        n = len(self.patient_ids)
+        self.baseline = np.column_stack([self.rng.normal(80, 8, n), self.rng.normal(120, 10, n)])
+        self.state = self.baseline.copy()
+        self.episode = np.zeros(n)  # Seconds of panic left per patient
+        self.episode_rate = episode_rate
+
+    def step(self, timestamp):
+        """One reading per patient: (patient_ids, timestamps, (n, 2) readings)"""
+        n = len(self.patient_ids)
+        starting = (self.episode <= 0) & (self.rng.random(n) < self.episode_rate)
+        self.episode[starting] = self.rng.uniform(20, 120, starting.sum())
+        target = self.baseline + (self.episode > 0)[:, None] * np.array([40.0, 35.0])
+        self.episode = np.maximum(self.episode - 1, 0)
+
+        # Mean-reverting random walk towards the current target
+        self.state += 0.1 * (target - self.state) + self.rng.normal(0, [1.5, 2.0], (n, 2))
+        return self.patient_ids, np.full(n, timestamp), self.state.astype(np.float32)
+
+    def run(self, monitor, rate_hz=1.0, duration=None):
+        """Feed monitor in real time until duration seconds have passed"""
+        slots = np.array([monitor.slot(patient_id) for patient_id in self.patient_ids])
+        start = time.monotonic()
+        period = 1.0 / rate_hz
+        tick = 0
+        while duration is None or tick * period < duration:
+            _, timestamps, readings = self.step(time.time())
+            monitor.add_batch(slots, timestamps, readings)
+            tick += 1
+            time.sleep(max(0.0, start + tick * period - time.monotonic()))
+
+
+def main(patients, seconds, window):
+    """Ingest simulated readings as fast as possible and report throughput"""
+    monitor = VitalsMonitor(window=window)
+    feed = SimulatedSensorFeed([f"P{i:05d}" for i in range(patients)])
+    slots = np.array([monitor.slot(patient_id) for patient_id in feed.patient_ids])
+
+    start = time.perf_counter()
+    for tick in range(seconds):
+        _, timestamps, readings = feed.step(float(tick))
+        monitor.add_batch(slots, timestamps, readings)
+    elapsed = time.perf_counter() - start
+
+    samples = patients * seconds
+    print(f"{samples} samples for {patients} patients in {elapsed:.3f}s "
+          f"({samples / elapsed:,.0f} samples/s, {elapsed / seconds * 1000:.2f} ms per 1 Hz tick)")
+    print(dict(zip(FEATURES, monitor.latest(feed.patient_ids[0]).round(3).tolist())))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulated vitals throughput check")
+    parser.add_argument('--patients', type=int, default=1000)
+    parser.add_argument('--seconds', type=int, default=600,
+                        help="Simulated seconds of 1 Hz readings")
+    parser.add_argument('--window', type=int, default=WINDOW)
+    args = parser.parse_args()
+    main(args.patients, args.seconds, args.window)
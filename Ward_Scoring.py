@@ -0,0 +1,122 @@
+import time
+import argparse
+import threading
+import numpy as np
+from collections import namedtuple
+from Sentiment_analysis import analyze_texts
+from Distress_Model import load_model
+from Distress_Calculator import (DEFAULT_HEART_RATE, DEFAULT_BLOOD_PRESSURE,
+                                 calculate_word_choice_score, calculate_context_score)
+from Vitals_Stream import VitalsMonitor, SimulatedSensorFeed
+
+WardScores = namedtuple('WardScores', 'probabilities emergencies timings')
+
+
+class WardScorer:
+    """Distress scores for every patient on a ward in one pass per tick.
+
+    Utterances are queued with submit() as they arrive. score() runs all of
+    them through the sentiment pipeline as one batch, writes each patient's
+    latest text scores into the vitals monitor (where they stay until the next
+    utterance), then runs the model once on the stacked (patients, inputs) view.
+    """
+
+    def __init__(self, vitals, model=None, sentiment_batch_size=64):
+        self.vitals = vitals
+        self.model = model if model is not None else load_model()
+        self.sentiment_batch_size = sentiment_batch_size
+        self.pending = []  # (patient_id, text) in arrival order
+        self.lock = threading.Lock()
+
+    def submit(self, patient_id, text):
+        """Queue an utterance for the next score()"""
+        if text:
+            with self.lock:
+                self.pending.append((patient_id, text))
+
+    def score(self):
+        """Score every patient known to the vitals monitor"""
+        start = time.perf_counter()
+        with self.lock:
+            pending, self.pending = self.pending, []
+
+        emergencies = []
+        if pending:
+            def on_emergency(index, result):
+                emergencies.append((pending[index][0], result))
+
+            results = analyze_texts([text for _, text in pending],
+                                    batch_size=self.sentiment_batch_size,
+                                    on_emergency=on_emergency)
+            # Later utterances overwrite earlier ones, so each patient keeps the latest
+            for (patient_id, text), result in zip(pending, results):
+                self.vitals.set_text_scores(patient_id, result['polarity'],
+                                            calculate_word_choice_score(text),
+                                            calculate_context_score(text))
+        sentiment_done = time.perf_counter()
+
+        patient_ids = list(self.vitals.slots)
+        X = self.vitals.model_inputs()
+        missing = self.vitals.count[:len(patient_ids)] == 0
+        if missing.any():
+            # Patients without a monitor feed yet get the example vitals, as in Calc_Panic_Prob
+            X = X.copy()
+            X[missing, :2] = (DEFAULT_HEART_RATE, DEFAULT_BLOOD_PRESSURE)
+        predictions = self.model.predict(X)[:, 0] if len(patient_ids) else np.zeros(0)
+        model_done = time.perf_counter()
+
+        probabilities = dict(zip(patient_ids, predictions.tolist()))
+        timings = {
+            'utterances': len(pending),
+            'patients': len(patient_ids),
+            'sentiment_ms': (sentiment_done - start) * 1000,
+            'model_ms': (model_done - sentiment_done) * 1000,
+            'total_ms': (time.perf_counter() - start) * 1000,
+        }
+        return WardScores(probabilities, emergencies, timings)
+
+
+SAMPLE_UTTERANCES = (
+    "I feel good today",
+    "I'm scared right now!",
+    "My head hurts",
+    "Where am I?",
+    "Can you play some music",
+    "I don't remember where I put my glasses",
+    "Thank you, that was lovely",
+)
+
+
+def main(rooms, ticks, utterance_rate):
+    """Simulated ward: vitals for every room each tick, utterances from some of them"""
+    vitals = VitalsMonitor(capacity=rooms)
+    feed = SimulatedSensorFeed([f"Room {i + 1}" for i in range(rooms)])
+    slots = np.array([vitals.slot(patient_id) for patient_id in feed.patient_ids])
+    scorer = WardScorer(vitals)
+    rng = np.random.default_rng(0)
+
+    totals = {}
+    for tick in range(ticks):
+        _, timestamps, readings = feed.step(float(tick))
+        vitals.add_batch(slots, timestamps, readings)
+        for i in np.flatnonzero(rng.random(rooms) < utterance_rate):
+            scorer.submit(feed.patient_ids[i], SAMPLE_UTTERANCES[rng.integers(len(SAMPLE_UTTERANCES))])
+
+        scores = scorer.score()
+        for name, value in scores.timings.items():
+            totals[name] = totals.get(name, 0) + value
+        for patient_id, result in scores.emergencies:
+            print(f"Tick {tick}: {patient_id} needs attention ({result['sentiment']})")
+
+    print(f"Per tick over {ticks} ticks: " +
+          ", ".join(f"{name} {value / ticks:.2f}" for name, value in totals.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a simulated ward every tick")
+    parser.add_argument('--rooms', type=int, default=300)
+    parser.add_argument('--ticks', type=int, default=30)
+    parser.add_argument('--utterance-rate', type=float, default=0.2,
+                        help="Chance that a room says something in a tick")
+    args = parser.parse_args()
+    main(args.rooms, args.ticks, args.utterance_rate)
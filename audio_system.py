@@ -1,13 +1,25 @@
 # audio_system.py
-import pyttsx3
 import os
-import subprocess
-import time
+import shutil
+from TTS_Cache import CachedSpeech
+from Playback_Engine import get_engine, SPEECH
+from Streaming_TTS import StreamingSpeaker
+
+# Prefer calming female voices
+PREFERRED_VOICES = [
+    'Microsoft Zira Desktop',
+    'Microsoft Hazel Desktop',
+    'VW Julie',
+    'VW Kate'
+]
 
 class AudioGenerator:
     def __init__(self):
         self.audio_dir = os.path.join(os.path.dirname(__file__), 'Audio_Files')
         self._ensure_directory()
+        # Calming speech parameters: slightly slower, not too loud, slightly lower pitch.
+        # One shared engine renders in these settings; renders are cached by text and voice settings.
+        self.speech = CachedSpeech(rate=140, volume=0.8, pitch=0.9, preferred_voices=PREFERRED_VOICES)
         
     def _ensure_directory(self):
         if not os.path.exists(self.audio_dir):
@@ -15,67 +27,33 @@ class AudioGenerator:
     
     def generate_soothing_voice(self, text, filename):
         """Generate calming speech from text"""
-        engine = pyttsx3.init()
-        self._configure_voice(engine)
-        
         output_path = os.path.join(self.audio_dir, f'{filename}.wav')
-        engine.save_to_file(text, output_path)
-        engine.runAndWait()
+        shutil.copyfile(self.speech.path(text), output_path)
         return output_path
-    
-    def _configure_voice(self, engine):
-        """Set optimal voice parameters"""
-        voices = engine.getProperty('voices')
-        
-        # Prefer calming female voices
-        preferred_voices = [
-            'Microsoft Zira Desktop',
-            'Microsoft Hazel Desktop',
-            'VW Julie',
-            'VW Kate'
-        ]
-        
-        for voice in voices:
-            if any(pref in voice.name for pref in preferred_voices):
-                engine.setProperty('voice', voice.id)
-                break
-        
-        # Calming speech parameters
-        engine.setProperty('rate', 140)  # Slightly slower
-        engine.setProperty('volume', 0.8)  # Not too loud
-        engine.setProperty('pitch', 0.9)  # Slightly lower pitch
 
 class AudioPlayer:
     def __init__(self):
         self.audio_dir = os.path.join(os.path.dirname(__file__), 'Audio_Files')
+        self.playback = get_engine()
     
-    def play_audio(self, filename):
-        """Play generated audio file"""
+    def play_audio(self, filename, on_done=None, priority=SPEECH):
+        """Queue an audio file on the in-process playback engine; returns its handle"""
         filepath = os.path.join(self.audio_dir, filename)
         if os.path.exists(filepath):
-            # Platform-independent playback
-            try:
-                if os.name == 'nt':  # Windows
-                    os.startfile(filepath)
-                else:  # Mac/Linux
-                    subprocess.call(['afplay' if sys.platform == 'darwin' else 'aplay', filepath])
-            except Exception as e:
-                print(f"Error playing audio: {e}")
+            return self.playback.play(filepath, priority=priority, on_done=on_done)
+        print(f"Audio file not found: {filepath}")
+        return None
 
 class AudioSystem(AudioGenerator, AudioPlayer):
     def __init__(self):
         AudioGenerator.__init__(self)
         AudioPlayer.__init__(self)
+        self.speaker = StreamingSpeaker(self.speech, self.playback)
     
-    def speak(self, text, delete_after=True):
-        """Generate and immediately play audio"""
-        filename = f"temp_{int(time.time())}"
-        audio_file = self.generate_soothing_voice(text, filename)
-        self.play_audio(audio_file)
-        
-        if delete_after:
-            time.sleep(1)  # Ensure playback completes
-            try:
-                os.remove(audio_file)
-            except:
-                pass
\ No newline at end of file
+    def speak(self, text, on_done=None, priority=SPEECH):
+        """Speak text sentence by sentence, synthesizing ahead while earlier parts play.
+
+        Returns the Streaming_TTS.Utterance at once; wait() on it or use on_done.
+        Its timings() report time-to-first-audio and total synthesis time.
+        """
+        return self.speaker.speak(text, priority=priority, on_done=on_done, background=True)
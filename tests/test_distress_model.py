@@ -0,0 +1,71 @@
+import math
+from types import SimpleNamespace
+import numpy as np
+import Distress_Model
+from Distress_Model import NumpyDistressModel, export_keras_weights, read_metadata, ARTIFACT_VERSION
+
+# Two inputs standardized with mean (100, 0) and std (10, 2), so the rows
+# below become (1, 1) and (-1, -1) before the first layer.
+X = [[110.0, 2.0], [90.0, -2.0]]
+MEAN, STD = [100.0, 0.0], [10.0, 2.0]
+W0, B0 = [[1.0, -1.0], [2.0, 1.0]], [0.0, 0.5]
+W1, B1 = [[1.0], [2.0]], [-1.0]
+# Layer 0: (1, 1) -> relu(3, 0.5) = (3, 0.5); (-1, -1) -> relu(-3, 0.5) = (0, 0.5)
+# Layer 1: 3 + 1 - 1 = 3 and 0 + 1 - 1 = 0
+EXPECTED = [[3.0], [0.0]]
+
+
+def write_artifact(path, output_activation='linear', **extra):
+    np.savez(path, W0=np.array(W0, np.float32), b0=np.array(B0, np.float32), act0=np.array('relu'),
+             W1=np.array(W1, np.float32), b1=np.array(B1, np.float32), act1=np.array(output_activation),
+             n_layers=np.array(2), mean=np.array(MEAN, np.float32), std=np.array(STD, np.float32),
+             **extra)
+    return str(path)
+
+
+def test_predict_matches_hand_computed_output(tmp_path):
+    model = NumpyDistressModel.load(write_artifact(tmp_path / 'model.npz'))
+    np.testing.assert_allclose(model.predict(X), EXPECTED, atol=1e-6)
+
+
+def test_output_activation_is_applied(tmp_path):
+    model = NumpyDistressModel.load(write_artifact(tmp_path / 'model.npz', 'sigmoid'))
+    np.testing.assert_allclose(model.predict(X), [[1 / (1 + math.exp(-3))], [0.5]], atol=1e-6)
+
+
+def test_single_sample_and_inputs_are_not_modified(tmp_path):
+    model = NumpyDistressModel.load(write_artifact(tmp_path / 'model.npz'))
+    sample = np.array(X[0], dtype=np.float32)
+    np.testing.assert_allclose(model.predict(sample), [EXPECTED[0]], atol=1e-6)
+    np.testing.assert_array_equal(sample, X[0])
+
+
+def test_export_round_trips_keras_style_layers(tmp_path):
+    def dense(kernel, bias, activation):
+        return SimpleNamespace(get_weights=lambda: [np.array(kernel), np.array(bias)],
+                               activation=SimpleNamespace(__name__=activation))
+    keras_model = SimpleNamespace(layers=[SimpleNamespace(get_weights=lambda: []),  # e.g. Input
+                                          dense(W0, B0, 'relu'), dense(W1, B1, 'linear')])
+    path = str(tmp_path / 'model.npz')
+    export_keras_weights(keras_model, path, mean=MEAN, std=STD, data_hash='abc')
+
+    np.testing.assert_allclose(NumpyDistressModel.load(path).predict(X), EXPECTED, atol=1e-6)
+    metadata = read_metadata(path)
+    assert metadata['version'] == ARTIFACT_VERSION and metadata['data_hash'] == 'abc'
+
+
+def test_artifacts_without_a_version_need_retraining(tmp_path):
+    assert read_metadata(write_artifact(tmp_path / 'model.npz')) is None
+    assert read_metadata(str(tmp_path / 'missing.npz')) is None
+
+
+def test_load_model_is_cached_until_reset(tmp_path):
+    path = write_artifact(tmp_path / 'model.npz')
+    Distress_Model.reset_model()
+    try:
+        first = Distress_Model.load_model(path)
+        assert Distress_Model.load_model(path) is first
+        Distress_Model.reset_model()
+        assert Distress_Model.load_model(path) is not first
+    finally:
+        Distress_Model.reset_model()
@@ -0,0 +1,86 @@
+import os
+import numpy as np
+import pytest
+from Face_Gallery import FaceGallery, ENCODING_SIZE, build_prototypes
+
+
+def random_encodings(n, seed=0):
+    return np.random.default_rng(seed).normal(0, 0.09, size=(n, ENCODING_SIZE)).astype(np.float32)
+
+
+def brute_force_match(encodings, labels, query, k):
+    """Nearest prototype per person with plain Python, sorted by distance"""
+    best = {}
+    for encoding, label in zip(encodings, labels):
+        distance = float(np.linalg.norm(encoding - query))
+        best[label] = min(distance, best.get(label, np.inf))
+    return sorted(best.items(), key=lambda item: item[1])[:k]
+
+
+def test_match_agrees_with_brute_force_on_interleaved_prototypes():
+    encodings = random_encodings(60)
+    labels = np.array([f"p{i % 17}" for i in range(60)])  # Unsorted, several rows per person
+    gallery = FaceGallery(encodings, labels)
+    queries = random_encodings(5, seed=1)
+
+    for query, result in zip(queries, gallery.match(queries, k=3)):
+        expected = brute_force_match(encodings, labels, query, k=3)
+        assert [label for label, _ in result] == [label for label, _ in expected]
+        np.testing.assert_allclose([d for _, d in result], [d for _, d in expected], rtol=1e-4)
+
+
+def test_match_returns_one_result_list_per_face():
+    gallery = FaceGallery(random_encodings(3), ['a', 'b', 'c'])
+    assert gallery.match(random_encodings(0).reshape(0, ENCODING_SIZE)) == []
+    results = gallery.match(random_encodings(2, seed=1), k=10)
+    assert len(results) == 2
+    assert all(len(row) == 3 for row in results)  # k is capped at the number of people
+
+
+def test_empty_gallery_matches_nothing():
+    gallery = FaceGallery.from_person_encodings({})
+    assert gallery.match(random_encodings(2)) == [[], []]
+
+
+def test_labels_must_line_up_with_encodings():
+    with pytest.raises(ValueError):
+        FaceGallery(random_encodings(3), ['a', 'b'])
+
+
+def test_prototypes_are_capped_per_person():
+    encodings = random_encodings(12)
+    assert build_prototypes(encodings, None).shape == (12, ENCODING_SIZE)
+    np.testing.assert_allclose(build_prototypes(encodings, 1)[0], encodings.mean(axis=0), rtol=1e-5)
+    assert build_prototypes(encodings, 3).shape == (3, ENCODING_SIZE)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    gallery = FaceGallery.from_person_encodings({'a': random_encodings(4), 'b': random_encodings(2, seed=1)})
+    gallery.save(str(tmp_path))
+    loaded = FaceGallery.load(str(tmp_path))
+    np.testing.assert_array_equal(loaded.encodings, gallery.encodings)
+    assert loaded.labels.tolist() == gallery.labels.tolist()
+    assert loaded.version == gallery.version
+
+    # A second save switches the manifest and keeps only the previous version's files
+    gallery.save(str(tmp_path))
+    gallery.save(str(tmp_path))
+    assert len(list(tmp_path.glob('*.npy'))) == 2 * len(gallery.files)
+
+
+def test_save_survives_files_that_cannot_be_removed_yet(tmp_path, monkeypatch):
+    gallery = FaceGallery.from_person_encodings({'a': random_encodings(2)})
+    gallery.save(str(tmp_path))
+    gallery.save(str(tmp_path))
+    oldest = set(gallery.files.values())
+
+    def locked(path):
+        raise PermissionError(path)  # What Windows raises for a mapped file
+    monkeypatch.setattr(os, 'remove', locked)
+    gallery.save(str(tmp_path))
+    assert FaceGallery.load(str(tmp_path)).version == gallery.version
+
+    monkeypatch.undo()
+    gallery.save(str(tmp_path))
+    assert len(list(tmp_path.glob('*.npy'))) == 2 * len(gallery.files)
+    assert not oldest & {path.name for path in tmp_path.glob('*.npy')}
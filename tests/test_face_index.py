@@ -0,0 +1,64 @@
+import numpy as np
+from Face_Gallery import FaceGallery, ENCODING_SIZE
+from Face_Index import IVFIndex
+
+
+def synthetic_gallery(size, seed=0):
+    rng = np.random.default_rng(seed)
+    encodings = rng.normal(0, 0.09, size=(size, ENCODING_SIZE)).astype(np.float32)
+    return FaceGallery(encodings, np.array([f"p{i // 2}" for i in range(size)]))
+
+
+def noisy_queries(gallery, n, seed=1):
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(len(gallery), size=n)
+    return gallery.encodings[rows] + rng.normal(0, 0.03, size=(n, ENCODING_SIZE)).astype(np.float32)
+
+
+def test_lists_partition_every_row():
+    index = IVFIndex.build(synthetic_gallery(2000).encodings)
+    assert sorted(index.order.tolist()) == list(range(2000))
+    assert index.offsets[0] == 0 and index.offsets[-1] == 2000
+    assert np.all(np.diff(index.offsets) >= 0)
+
+
+def test_probing_every_list_is_exact():
+    gallery = synthetic_gallery(3000)
+    queries = noisy_queries(gallery, 8)
+    exact = gallery.match(queries, k=3)
+    gallery.index = IVFIndex.build(gallery.encodings)
+    approx = gallery.match(queries, k=3, n_probe=len(gallery.index.centroids))
+    assert [[label for label, _ in row] for row in approx] == [[label for label, _ in row] for row in exact]
+    np.testing.assert_allclose([[d for _, d in row] for row in approx],
+                               [[d for _, d in row] for row in exact], rtol=1e-4)
+
+
+def test_default_probe_recall():
+    gallery = synthetic_gallery(20000)
+    queries = noisy_queries(gallery, 200)
+    exact = [row[0][0] for row in gallery.match(queries, k=1)]
+    gallery.index = IVFIndex.build(gallery.encodings)
+    approx = [row[0][0] if row else None for row in gallery.match(queries, k=1, n_probe=8)]
+    recall = np.mean([a == e for a, e in zip(approx, exact)])
+    assert recall >= 0.95
+
+
+def test_small_galleries_ignore_the_index_unless_asked():
+    gallery = synthetic_gallery(500)
+    queries = noisy_queries(gallery, 4)
+    exact = gallery.match(queries, k=2)
+
+    class Unused:
+        def candidates(self, *args):
+            raise AssertionError("index used below INDEX_MIN_SIZE")
+    gallery.index = Unused()
+    assert gallery.match(queries, k=2) == exact
+
+
+def test_save_and_load_with_index(tmp_path):
+    gallery = synthetic_gallery(1000)
+    index = IVFIndex.build(gallery.encodings)
+    gallery.save(str(tmp_path), index=index)
+    loaded = FaceGallery.load(str(tmp_path))
+    np.testing.assert_array_equal(loaded.index.order, index.order)
+    np.testing.assert_allclose(loaded.index.centroids, index.centroids)
@@ -0,0 +1,50 @@
+from Lexicon import Lexicon, tokenize, get_lexicon
+
+CATEGORIES = {
+    'distress': {'weight': 1, 'phrases': ['help', 'help me', 'scared']},
+    'harmful': {'weight': 2, 'phrases': [{'phrase': 'hurt myself', 'weight': 5, 'reply': 'crisis'}]},
+    'intent_greeting': {'phrases': ['hi', 'good morning']},
+}
+
+
+def test_tokenize_keeps_contractions_and_normalizes_apostrophes():
+    assert tokenize("I DON’T feel well!") == ['i', "don't", 'feel', 'well']
+
+
+def test_overlapping_phrases_all_match():
+    match = Lexicon(CATEGORIES).match("Please help me, I'm scared")
+    assert [hit.phrase for hit in match.hits('distress')] == ['help', 'help me', 'scared']
+    assert match.token_count == 5
+
+
+def test_phrases_only_match_whole_words():
+    match = Lexicon(CATEGORIES).match("this is a philosophy of helpers")
+    assert not match.has('intent_greeting')
+    assert not match.has('distress')
+
+
+def test_multi_word_phrases_need_consecutive_tokens():
+    lexicon = Lexicon(CATEGORIES)
+    assert lexicon.match("good morning to you").has('intent_greeting')
+    assert not lexicon.match("good sunny morning").has('intent_greeting')
+
+
+def test_entry_weight_and_data_override_category_defaults():
+    match = Lexicon(CATEGORIES).match("I want to hurt myself")
+    (hit,) = match.hits('harmful')
+    assert hit.weight == 5
+    assert hit.data == {'reply': 'crisis'}
+    assert hit.start == 3
+    assert match.max_weight('harmful') == 5
+    assert match.max_weight('distress', default=0) == 0
+
+
+def test_empty_text_has_no_hits():
+    match = Lexicon(CATEGORIES).match(None)
+    assert match.all == [] and match.token_count == 0
+
+
+def test_bundled_lexicon_loads():
+    lexicon = get_lexicon()
+    assert lexicon.match("hello there").has('intent_greeting')
+    assert lexicon.match("goodbye").has('intent_goodbye')
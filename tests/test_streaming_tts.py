@@ -0,0 +1,112 @@
+import threading
+
+import pytest
+
+pytest.importorskip('pygame')  # Streaming_TTS pulls in the playback engine
+
+from Streaming_TTS import split_chunks, FIRST_CHUNK_WORDS, MAX_CHUNK_CHARS, MIN_CHUNK_WORDS
+
+
+def words(chunk):
+    return len(chunk.split())
+
+
+def test_short_reply_is_one_chunk():
+    assert split_chunks("I'm here with you.") == ["I'm here with you."]
+
+
+def test_empty_text_has_no_chunks():
+    assert split_chunks('') == []
+    assert split_chunks('   ') == []
+
+
+def test_chunks_keep_every_word_in_order():
+    text = ("Do you remember when you used to go swimming with your family at the lake? "
+            "Your father loved fishing there, and your mother always packed sandwiches. "
+            "Tell me about it.")
+    assert ' '.join(split_chunks(text)).split() == text.split()
+
+
+def test_first_chunk_splits_a_single_clause_sentence_at_a_word_boundary():
+    text = "Do you remember when you used to go swimming with your family at the lake?"
+    chunks = split_chunks(text)
+    assert len(chunks) == 2
+    assert words(chunks[0]) <= FIRST_CHUNK_WORDS
+    assert ' '.join(chunks) == text
+
+
+def test_first_chunk_prefers_an_early_clause_break():
+    chunks = split_chunks("Take your time, you are safe here and I will stay with you until you feel better.")
+    assert chunks[0] == "Take your time,"
+
+
+def test_long_sentence_without_commas_is_bounded():
+    text = ' '.join(f"word{i}" for i in range(22)) + '.'
+    chunks = split_chunks(text)
+    assert words(chunks[0]) <= FIRST_CHUNK_WORDS
+    assert all(len(chunk) <= MAX_CHUNK_CHARS for chunk in chunks)
+    assert ' '.join(chunks) == text
+
+
+def test_abbreviations_do_not_end_a_sentence():
+    chunks = split_chunks("Dr. Smith will visit soon. Mr. Jones called about lunch.")
+    assert chunks == ["Dr. Smith will visit soon.", "Mr. Jones called about lunch."]
+
+
+def test_initials_do_not_end_a_sentence():
+    assert split_chunks("J. R. Smith sent a card.") == ["J. R. Smith sent a card."]
+
+
+def test_short_fragments_are_merged():
+    chunks = split_chunks("Hello there. I hope you slept well. It is sunny today.")
+    assert all(words(chunk) >= MIN_CHUNK_WORDS for chunk in chunks)
+
+
+class FakeHandle:
+    def __init__(self, on_start):
+        self.on_start = on_start
+        self.state = 'queued'
+        self.finished = threading.Event()
+
+    def start(self):
+        self.state = 'playing'
+        if self.on_start is not None:
+            self.on_start(self)
+        self.state = 'done'
+        self.finished.set()
+
+    def wait(self, timeout=None):
+        return self.finished.wait(timeout)
+
+    def cancel(self):
+        pass
+
+
+class FakePlayback:
+    def __init__(self):
+        self.handles = []
+
+    def play(self, audio, priority=None, label=None, on_start=None):
+        handle = FakeHandle(on_start)
+        self.handles.append(handle)
+        return handle
+
+
+class FakeSpeech:
+    def get(self, chunk):
+        return b'RIFF'
+
+
+def test_first_audio_is_stamped_when_playback_starts():
+    from Streaming_TTS import StreamingSpeaker
+    playback = FakePlayback()
+    speaker = StreamingSpeaker(FakeSpeech(), playback)
+    utterance = speaker.speak("Dr. Smith will visit soon. Mr. Jones called about lunch.")
+    assert len(playback.handles) == 2
+    assert utterance.first_audio is None  # Queued but not yet audible
+
+    for handle in playback.handles:
+        handle.start()
+    assert utterance.wait(1)
+    assert utterance.first_audio is not None
+    assert utterance.state == 'done'
@@ -0,0 +1,71 @@
+import os
+import numpy as np
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+import Training_Data
+from Training_Data import (build_cache, read_manifest, iter_batches, split_batches, split_rows,
+                           word_choice_scores, context_scores)
+
+
+def write_vitals_csv(directory, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    path = os.path.join(directory, 'Alzie_database.csv')
+    pd.DataFrame({
+        'Resting heart rate': rng.integers(60, 90, rows),
+        'panic heart rate': rng.integers(90, 150, rows),
+        'pitch': rng.integers(100, 130, rows),
+        'panic pitch': rng.integers(120, 170, rows),
+        'sentiment': rng.uniform(0, 1, rows).round(2),
+        'true/false': rng.random(rows) < 0.5,
+        'Value': rng.uniform(0, 1, rows).round(1),
+    }).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def two_part_cache(tmp_path):
+    source = write_vitals_csv(str(tmp_path), 18)
+    return build_cache([source], str(tmp_path / 'cache'), chunk_size=13)
+
+
+@pytest.mark.parametrize('batch_size', [1, 4, 5, 32])
+@pytest.mark.parametrize('split', ['train', 'validation'])
+def test_split_batches_counts_one_pass_of_iter_batches(two_part_cache, split, batch_size):
+    batches = list(iter_batches(two_part_cache, split, batch_size))
+    assert len(batches) == split_batches(two_part_cache, split, batch_size)
+    assert sum(len(y) for _, y in batches) == split_rows(two_part_cache, split)
+
+
+def test_validation_pass_covers_every_held_out_row(two_part_cache):
+    # 13 + 5 rows: rows 0, 5, 10 and 15 are held out, split 3 + 1 across the parts
+    assert split_rows(two_part_cache, 'validation') == 4
+    assert split_batches(two_part_cache, 'validation', 4) == 2
+
+
+def test_baseline_rows_are_on_the_polarity_scale(two_part_cache):
+    X = np.vstack([X for X, _ in iter_batches(two_part_cache, 'train', 32, normalize=False)])
+    polarity = X[:, Training_Data.FEATURE_COLUMNS.index('polarity')]
+    assert polarity.min() >= -1.0 and polarity.max() <= 1.0
+    assert X.shape[1] == len(Training_Data.FEATURE_COLUMNS)
+
+
+def test_rebuild_writes_new_parts_and_keeps_the_previous_build(tmp_path, two_part_cache):
+    cache_dir = two_part_cache['directory']
+    first = {part['file'] for part in two_part_cache['parts']}
+    second = build_cache([os.path.join(str(tmp_path), 'Alzie_database.csv')], cache_dir, chunk_size=13)
+    files = {part['file'] for part in second['parts']}
+    assert not files & first
+    assert read_manifest(cache_dir)['version'] == second['version']
+    assert {name for name in os.listdir(cache_dir) if name.endswith('.npz')} == first | files
+
+
+def test_text_scores_match_the_scalar_functions():
+    from Distress_Calculator import calculate_word_choice_score, calculate_context_score
+    texts = pd.Series(["I'm scared, please help me!", "", "I feel good today", "help HELP help",
+                       "Where am I? I am afraid and in pain and nobody will come to help me now"])
+    np.testing.assert_allclose(word_choice_scores(texts),
+                               [calculate_word_choice_score(t) for t in texts], rtol=1e-6)
+    np.testing.assert_allclose(context_scores(texts),
+                               [calculate_context_score(t) for t in texts], rtol=1e-6)
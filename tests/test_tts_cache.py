@@ -0,0 +1,125 @@
+import os
+import time
+from types import SimpleNamespace
+import sys
+import TTS_Cache
+from TTS_Cache import (PhraseCache, VoiceSettings, SpeechSynthesizer, CachedSpeech,
+                       cache_key, choose_voice, get_cache)
+
+
+def render(cache, key, data=b'RIFF'):
+    """Stand in for the synthesizer: write the WAV file the cache points at"""
+    with open(cache.path(key), 'wb') as f:
+        f.write(data)
+
+
+def test_cache_key_depends_on_text_and_voice():
+    settings = VoiceSettings('zira', 150, 1.0, None)
+    assert cache_key("Hello", settings) == cache_key("Hello", settings)
+    assert cache_key("Hello", settings) != cache_key("Hello", settings._replace(rate=140))
+    assert cache_key("Hello", settings) != cache_key("Hello.", settings)
+
+
+def test_choose_voice_prefers_listed_then_female():
+    voices = [SimpleNamespace(id='1', name='David'), SimpleNamespace(id='2', name='Susan Female'),
+              SimpleNamespace(id='3', name='Microsoft Zira Desktop')]
+    assert choose_voice(voices, ['Microsoft Zira Desktop']) == '3'
+    assert choose_voice(voices) == '2'
+    assert choose_voice(voices[:1]) is None
+
+
+def test_memory_and_disk_hits_are_counted(tmp_path):
+    cache = PhraseCache(str(tmp_path))
+    assert cache.get('k') is None
+    render(cache, 'k', b'audio')
+    cache.record('k', "hello", 0.5)
+
+    assert cache.get('k') == b'audio'  # From disk, then kept in memory
+    assert cache.get('k') == b'audio'
+    stats = cache.stats()
+    assert (stats['misses'], stats['disk_hits'], stats['memory_hits']) == (1, 1, 1)
+    assert stats['saved_seconds'] == 1.0
+
+
+def test_index_survives_restart(tmp_path):
+    cache = PhraseCache(str(tmp_path))
+    render(cache, 'k')
+    cache.record('k', "hello", 0.5)
+    assert 'k' in PhraseCache(str(tmp_path))
+
+
+def test_instances_sharing_a_directory_keep_each_others_entries(tmp_path):
+    first, second = PhraseCache(str(tmp_path)), PhraseCache(str(tmp_path))
+    render(first, 'alpha')
+    first.record('alpha', "alpha", 0.1)
+    render(second, 'beta')
+    second.record('beta', "beta", 0.1)
+    assert list(PhraseCache(str(tmp_path)).index) == ['alpha', 'beta']
+
+
+def test_disk_entries_bound_the_files_on_disk(tmp_path):
+    first, second = PhraseCache(str(tmp_path), disk_entries=2), PhraseCache(str(tmp_path), disk_entries=2)
+    for cache, key in ((first, 'a'), (second, 'b'), (first, 'c')):
+        render(cache, key)
+        cache.record(key, key, 0.1)
+    assert sorted(os.listdir(tmp_path)) == ['b.wav', 'c.wav', 'index.json']
+
+
+def test_batched_records_are_written_on_save(tmp_path):
+    cache = PhraseCache(str(tmp_path))
+    for key in ('a', 'b', 'c'):
+        render(cache, key)
+        cache.record(key, key, 0.1, save=False)
+    assert list(PhraseCache(str(tmp_path)).index) == []
+    cache.save()
+    assert list(PhraseCache(str(tmp_path)).index) == ['a', 'b', 'c']
+
+
+def test_old_unindexed_files_are_removed_at_startup(tmp_path):
+    render(PhraseCache(str(tmp_path)), 'orphan')
+    old = time.time() - TTS_Cache.ORPHAN_GRACE - 1
+    os.utime(tmp_path / 'orphan.wav', (old, old))
+    render(PhraseCache(str(tmp_path)), 'fresh')  # Maybe still being recorded; kept
+    PhraseCache(str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == ['fresh.wav']
+
+
+def test_get_cache_shares_one_instance_per_directory(tmp_path):
+    assert get_cache(str(tmp_path)) is get_cache(str(tmp_path) + os.sep)
+
+
+class FakeEngine:
+    """pyttsx3 engine double that writes the properties in effect into each file"""
+
+    def __init__(self):
+        self.properties = {'voice': 'default', 'voices': [SimpleNamespace(id='zira', name='Zira')]}
+        self.jobs = []
+
+    def getProperty(self, name):
+        return self.properties[name]
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def save_to_file(self, text, path):
+        self.jobs.append((text, path))
+
+    def runAndWait(self):
+        for text, path in self.jobs:
+            with open(path, 'w') as f:
+                f.write(f"{text}|{self.properties['voice']}|{self.properties['rate']}")
+        self.jobs = []
+
+
+def test_speakers_sharing_the_synthesizer_keep_their_own_settings(tmp_path, monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setitem(sys.modules, 'pyttsx3', SimpleNamespace(init=lambda: engine))
+    synthesizer = SpeechSynthesizer()
+    cache = PhraseCache(str(tmp_path))
+    calm = CachedSpeech(rate=140, preferred_voices=['Zira'], synthesizer=synthesizer, cache=cache)
+    plain = CachedSpeech(rate=150, synthesizer=synthesizer, cache=cache)
+
+    assert calm.get("hello") == b"hello|zira|140"
+    assert plain.get("hello") == b"hello|default|150"
+    assert calm.get("bye") == b"bye|zira|140"
+    assert calm.key("hello") != plain.key("hello")
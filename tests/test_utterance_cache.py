@@ -0,0 +1,48 @@
+import Utterance_Cache
+from Utterance_Cache import UtteranceCache, normalize, cache_stats
+
+
+def test_normalize_ignores_case_and_spacing():
+    assert normalize("  I feel   SCARED ") == "i feel scared"
+
+
+def test_repeated_utterance_is_a_hit():
+    cache = UtteranceCache('test-hit')
+    calls = []
+    compute = lambda text: calls.append(text) or len(text)
+    assert cache.get_or_compute("Hello there", compute) == 11
+    assert cache.get_or_compute("hello  THERE", compute) == 11
+    assert calls == ["Hello there"]
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = UtteranceCache('test-lru', max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")  # "b" is now the oldest
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_expired_entries_are_recomputed(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(Utterance_Cache.time, 'monotonic', lambda: now[0])
+    cache = UtteranceCache('test-ttl', ttl=60)
+    cache.put("hi", 'first')
+    now[0] += 59
+    assert cache.get("hi") == 'first'
+    now[0] += 2
+    assert cache.get("hi") is None
+    assert cache.stats()['expirations'] == 1
+    assert cache.stats()['entries'] == 0
+
+
+def test_stats_are_reported_per_cache():
+    cache = UtteranceCache('test-stats')
+    cache.get("missing")
+    assert cache_stats()['test-stats']['misses'] == 1
+    cache.clear()
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from Vitals_Stream import VitalsMonitor, FEATURES, MODEL_INPUTS
+
+
+def brute_force(values, times):
+    """Mean, variance, per-second slope and last value of each channel"""
+    values = np.asarray(values, dtype=np.float64)
+    mean = values.mean(axis=0)
+    var = values.var(axis=0)
+    slope = (np.polyfit(times, values, 1)[0] if len(values) >= 2
+             else np.zeros(values.shape[1]))
+    return mean, var, slope, values[-1]
+
+
+def feed(monitor, patient_id, readings, interval=1.0):
+    for i, (hr, bp) in enumerate(readings):
+        monitor.add(patient_id, 1000.0 + i * interval, hr, bp)
+
+
+@pytest.mark.parametrize('samples', [1, 2, 7, 8, 9, 25, 64])
+def test_features_match_brute_force_over_the_window(samples):
+    window = 8
+    rng = np.random.default_rng(samples)
+    readings = np.column_stack([rng.normal(80, 10, samples), rng.normal(120, 15, samples)])
+    monitor = VitalsMonitor(window=window)
+    feed(monitor, 'P1', readings, interval=2.0)
+
+    kept = readings[-window:]
+    times = 1000.0 + 2.0 * np.arange(samples)[-window:]
+    mean, var, slope, last = brute_force(kept, times)
+    features = dict(zip(FEATURES, monitor.latest('P1')))
+    np.testing.assert_allclose([features['hr_mean'], features['bp_mean']], mean, rtol=1e-5)
+    np.testing.assert_allclose([features['hr_var'], features['bp_var']], var, rtol=1e-4, atol=1e-3)
+    np.testing.assert_allclose([features['hr_slope'], features['bp_slope']], slope, rtol=1e-4, atol=1e-4)
+    np.testing.assert_allclose([features['hr_last'], features['bp_last']], last, rtol=1e-6)
+
+
+def test_long_streams_do_not_drift():
+    window = 60
+    rng = np.random.default_rng(0)
+    readings = np.column_stack([rng.normal(80, 10, 10_000), rng.normal(120, 15, 10_000)])
+    monitor = VitalsMonitor(window=window)
+    feed(monitor, 'P1', readings)
+
+    mean, var, slope, _ = brute_force(readings[-window:], np.arange(window, dtype=np.float64))
+    features = dict(zip(FEATURES, monitor.latest('P1')))
+    np.testing.assert_allclose([features['hr_mean'], features['bp_mean']], mean, rtol=1e-5)
+    np.testing.assert_allclose([features['hr_var'], features['bp_var']], var, rtol=1e-4)
+    np.testing.assert_allclose([features['hr_slope'], features['bp_slope']], slope, atol=1e-4)
+
+
+def test_batch_ingest_matches_single_readings():
+    rng = np.random.default_rng(1)
+    readings = rng.normal([80, 120], [10, 15], size=(30, 5, 2)).astype(np.float32)
+    single, batched = VitalsMonitor(window=10), VitalsMonitor(window=10)
+    patient_ids = [f"P{i}" for i in range(5)]
+    slots = np.array([batched.slot(patient_id) for patient_id in patient_ids])
+    for tick, row in enumerate(readings):
+        for patient_id, (hr, bp) in zip(patient_ids, row):
+            single.add(patient_id, float(tick), hr, bp)
+        batched.add_batch(slots, np.full(5, float(tick)), row)
+    np.testing.assert_allclose(single.model_inputs(), batched.model_inputs())
+
+
+def test_slots_grow_past_the_initial_capacity():
+    monitor = VitalsMonitor(window=4, capacity=2)
+    for i in range(5):
+        monitor.add(f"P{i}", 0.0, 70 + i, 110 + i)
+    assert len(monitor) == 5
+    assert monitor.capacity >= 5
+    np.testing.assert_allclose(monitor.model_inputs()[:, 0], [70, 71, 72, 73, 74])
+
+
+def test_model_input_is_a_view_that_carries_text_scores():
+    monitor = VitalsMonitor(window=4)
+    monitor.add('P1', 0.0, 90, 130)
+    view = monitor.model_input('P1')
+    assert view.shape == (1, MODEL_INPUTS)
+    monitor.set_text_scores('P1', -0.5, 0.25, 0.3)
+    np.testing.assert_allclose(view, [[90, 130, -0.5, 0.25, 0.3]])
+    monitor.add('P1', 1.0, 100, 140)  # New vitals keep the utterance's scores
+    np.testing.assert_allclose(view, [[95, 135, -0.5, 0.25, 0.3]])
+    assert monitor.has_readings('P1')
+    assert not monitor.has_readings('P2')